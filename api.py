@@ -0,0 +1,144 @@
+"""
+Headless JSON API over the same lookup, summarization and evaluation logic as
+the Streamlit UI (engine.py).
+
+    python api.py --port 8000 --workers 4      (or: uvicorn api:app)
+
+    GET  /lookup?word=...            POST /lookup        {"word": ...}
+    POST /lookup_many                {"words": [...]}
+    POST /summarize                  {"text": ..., "ratio": 0.4, "method": "hybrid" | "tfidf" | "position" | "ai",
+                                      "evaluate": false}
+    POST /evaluate                   {"text": ..., "summary": ..., "method": ""}
+    GET  /healthz, /metrics
+
+Each worker process runs at most TLA_API_CONCURRENCY blocking calls at once and
+answers 503 when more than TLA_API_QUEUE are waiting. Workers keep no state of
+their own: lookups go through the host-wide SQLite cache and rate limits, so the
+service scales by adding workers or hosts, and can run next to the UI.
+"""
+import os
+from functools import partial
+import anyio
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+import engine, metrics
+
+API_CONCURRENCY = int(os.environ.get("TLA_API_CONCURRENCY", 16))
+API_QUEUE       = int(os.environ.get("TLA_API_QUEUE", 256))
+API_MAX_WORDS   = int(os.environ.get("TLA_API_MAX_WORDS", 500))
+API_MAX_CHARS   = int(os.environ.get("TLA_API_MAX_CHARS", 200_000))
+METHODS = ("hybrid", "tfidf", "position", "ai")
+
+
+class BadRequest(Exception):
+    pass
+
+
+class Busy(Exception):
+    pass
+
+
+_limiter = None
+
+async def _run(fn, *a, **kw):
+    """Run blocking engine code on a worker thread, at most API_CONCURRENCY at a time."""
+    global _limiter
+    if _limiter is None:
+        _limiter = anyio.CapacityLimiter(API_CONCURRENCY)
+    if _limiter.statistics().tasks_waiting >= API_QUEUE:
+        raise Busy()
+    return await anyio.to_thread.run_sync(partial(fn, *a, **kw), limiter=_limiter)
+
+async def _body(request):
+    try:
+        data = await request.json()
+    except Exception:
+        raise BadRequest("body must be JSON")
+    if not isinstance(data, dict):
+        raise BadRequest("body must be a JSON object")
+    return data
+
+def _text(data, key):
+    v = data.get(key)
+    if not isinstance(v, str) or not v.strip():
+        raise BadRequest(f"'{key}' must be a non-empty string")
+    if len(v) > API_MAX_CHARS:
+        raise BadRequest(f"'{key}' is longer than {API_MAX_CHARS} characters")
+    return v
+
+
+async def lookup(request):
+    word = request.query_params.get("word") if request.method == "GET" else (await _body(request)).get("word")
+    if not isinstance(word, str) or not word.strip():
+        raise BadRequest("'word' must be a non-empty string")
+    return JSONResponse({"word": word.strip(), **await _run(engine.lookup, word)})
+
+async def lookup_many(request):
+    words = (await _body(request)).get("words")
+    if not isinstance(words, list) or not all(isinstance(w, str) for w in words):
+        raise BadRequest("'words' must be a list of strings")
+    if len(words) > API_MAX_WORDS:
+        raise BadRequest(f"at most {API_MAX_WORDS} words per request")
+    return JSONResponse({"results": await _run(engine.lookup_many, words)})
+
+async def summarize(request):
+    data   = await _body(request)
+    text   = _text(data, "text")
+    method = data.get("method", "hybrid")
+    ratio  = data.get("ratio", 0.4)
+    if method not in METHODS:
+        raise BadRequest(f"'method' must be one of {', '.join(METHODS)}")
+    if not isinstance(ratio, (int, float)) or not 0 < ratio < 1:
+        raise BadRequest("'ratio' must be between 0 and 1")
+    if method == "ai":
+        summary = await _run(engine.abstractive_summarize_ai, text, data.get("length", "medium"))
+        if not summary:
+            return JSONResponse({"error": "AI summary unavailable"}, status_code=502)
+        out = {"summary": summary, "method": method}
+    else:
+        summary, selected, _ = await _run(engine.extractive_summarize, text, ratio, method)
+        out = {"summary": summary, "selected": selected, "method": method}
+    if data.get("evaluate"):
+        out["evaluation"] = await _run(engine.evaluate_summary, text, summary, method)
+    return JSONResponse(out)
+
+async def evaluate(request):
+    data = await _body(request)
+    return JSONResponse(await _run(engine.evaluate_summary, _text(data, "text"), _text(data, "summary"),
+                                   data.get("method", "")))
+
+async def healthz(request):
+    return JSONResponse({"ok": True, "dictionary": len(engine.TDICT)})
+
+async def prometheus(request):
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+async def _bad_request(request, exc):
+    return JSONResponse({"error": str(exc)}, status_code=400)
+
+async def _busy(request, exc):
+    return JSONResponse({"error": "too many requests in flight"}, status_code=503, headers={"Retry-After": "1"})
+
+app = Starlette(
+    routes=[
+        Route("/lookup", lookup, methods=["GET", "POST"]),
+        Route("/lookup_many", lookup_many, methods=["POST"]),
+        Route("/summarize", summarize, methods=["POST"]),
+        Route("/evaluate", evaluate, methods=["POST"]),
+        Route("/healthz", healthz),
+        Route("/metrics", prometheus),
+    ],
+    exception_handlers={BadRequest: _bad_request, Busy: _busy},
+)
+
+
+if __name__ == "__main__":
+    import argparse, uvicorn
+    ap = argparse.ArgumentParser(description="Serve the Tamil Language Assistant JSON API.")
+    ap.add_argument("--host", default="0.0.0.0")
+    ap.add_argument("--port", type=int, default=8000)
+    ap.add_argument("--workers", type=int, default=1)
+    args = ap.parse_args()
+    uvicorn.run("api:app", host=args.host, port=args.port, workers=args.workers)
@@ -1,7 +1,11 @@
 import streamlit as st
-import json, re, io, math
-from pathlib import Path
+import os, math, time, shutil, tempfile
+from contextlib import contextmanager
 from collections import Counter
+import prefetch, resilience, ratelimit, metrics, extract, doc_cache, ocr
+from pathlib import Path
+from engine import (TDICT, TTRIE, TREV, LCACHE, clean_word, is_tamil_word, tier2_json, lookup, lookup_many,
+                    race_stats, breaker, extractive_summarize, abstractive_summarize_ai, evaluate_summary)
 
 st.set_page_config(
     page_title="தமிழ்நாடு அரசு | Tamil Language Assistant",
@@ -398,76 +402,100 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-_TAMIL_RE   = re.compile(r'[\u0B80-\u0BFF]+')
-_PUNC_STRIP = re.compile(r'^[^\u0B80-\u0BFF]+|[^\u0B80-\u0BFF]+$')
-
-def clean_word(w):
-    w = _PUNC_STRIP.sub('', w).strip()
-    return re.sub(r'[\u0B82\u0B83]+$', '', w)
-
-def is_tamil_word(w):
-    cw = clean_word(w)
-    return len(cw) >= 2 and bool(_TAMIL_RE.search(cw))
-
-@st.cache_data(show_spinner=False)
-def load_dict():
-    p = Path(__file__).parent / "tamil.json"
-    if p.exists():
-        with open(p, encoding="utf-8") as f:
-            return json.load(f)
-    return {}
-
-TDICT = load_dict()
+PREFETCH_ON      = os.environ.get("TLA_PREFETCH", "1") != "0"
+PREFETCH_WORKERS = int(os.environ.get("TLA_PREFETCH_WORKERS", 4))
+PREFETCH_RATE    = float(os.environ.get("TLA_PREFETCH_RATE", 4))
+PREFETCH_BATCH   = int(os.environ.get("TLA_PREFETCH_BATCH", 40))
+PDF_MAX_PAGES    = int(os.environ.get("TLA_PDF_MAX_PAGES", 500))    # 0 for no limit
+PDF_WORKERS      = int(os.environ.get("TLA_PDF_WORKERS", min(4, os.cpu_count() or 1)))
+PDF_PARALLEL_MIN = int(os.environ.get("TLA_PDF_PARALLEL_MIN", 64))   # pages before a PDF is split across workers
+PDF_OCR          = os.environ.get("TLA_PDF_OCR", "1") != "0"        # OCR scanned pages when Tesseract is installed
+UPLOAD_MAX_MB    = int(os.environ.get("TLA_UPLOAD_MAX_MB", 100))
+UPLOAD_SPILL_MB  = int(os.environ.get("TLA_UPLOAD_SPILL_MB", 8))     # larger uploads are extracted from a temp file
+DOC_MAX_CHARS    = int(os.environ.get("TLA_DOC_MAX_CHARS", 2_000_000))
+DOC_CACHE_DIR    = Path(os.environ.get("TLA_DOC_CACHE", Path(__file__).parent / ".cache" / "docs"))
+DOC_CACHE_MB     = int(os.environ.get("TLA_DOC_CACHE_MB", 512))
+BROWSE_PAGE = 6
 TAMIL_VOWELS     = list("அஆஇஈஉஊஎஏஐஒஓஔ")
 TAMIL_CONSONANTS = list("கசடதபறஞஜஸஷஹணனநமயரலவழளஃ")
 
-def extract_docx(data):
-    from docx import Document
-    doc = Document(io.BytesIO(data))
-    blocks = []
-    for para in doc.paragraphs:
-        text = para.text.strip()
-        if not text:
-            continue
-        style = para.style.name if para.style else ""
-        if "Heading" in style:
-            blocks.append({"type":"heading","text":text})
-        elif "List" in style:
-            blocks.append({"type":"list","text":text})
-        else:
-            blocks.append({"type":"para","text":text})
-    return blocks
-
-def extract_pdf(data):
-    import fitz
-    doc = fitz.open(stream=data, filetype="pdf")
+@st.cache_resource(show_spinner=False)
+def load_doc_cache():
+    return doc_cache.DocCache(DOC_CACHE_DIR, DOC_CACHE_MB << 20)
+
+DCACHE = load_doc_cache()
+metrics.collect("tla_doc_cache_events_total", "counter", "Extraction cache hits, misses and evictions.",
+                lambda: [({"event":k}, v) for k, v in DCACHE.stats().items() if k in ("hits", "misses", "evictions")])
+
+def upload_digest(uploaded):
+    """SHA-256 of the upload, hashed once per uploaded file rather than on every rerun."""
+    fid = getattr(uploaded, "file_id", None) or uploaded.name
+    cached = st.session_state.get("upload_digest")
+    if not cached or cached[0] != fid:
+        cached = st.session_state.upload_digest = (fid, doc_cache.digest(uploaded))
+    return cached[1]
+
+@contextmanager
+def upload_source(uploaded):
+    """The upload as bytes or, above UPLOAD_SPILL_MB, as the path of a temp copy removed afterwards."""
+    if uploaded.size <= UPLOAD_SPILL_MB << 20:
+        yield uploaded.getvalue()
+        return
+    with tempfile.NamedTemporaryFile(prefix="tla-upload-", suffix=Path(uploaded.name).suffix) as tmp:
+        uploaded.seek(0)
+        shutil.copyfileobj(uploaded, tmp, 1 << 20)
+        tmp.flush()
+        yield tmp.name
+
+@metrics.timed("extract_document")
+def extract_document(uploaded, digest, pages=None, on_page=None):
+    """
+    Blocks of the uploaded file, at most PDF_MAX_PAGES pages and DOC_MAX_CHARS characters
+    of it; `on_page(blocks, done, total)` is called after each PDF page. Results are cached
+    by content hash across sessions; on an error the pages read so far are kept but not cached.
+    """
+    key = DCACHE.key(digest, uploaded.name.rsplit(".", 1)[-1].lower(), pages, PDF_MAX_PAGES, DOC_MAX_CHARS,
+                     extract.VERSION, PDF_OCR and ocr.available())
+    blocks = DCACHE.get(key)
+    if blocks is not None: return blocks
     blocks = []
-    for page in doc:
-        for line in page.get_text().splitlines():
-            line = line.strip()
-            if len(line) > 2:
-                blocks.append({"type":"para","text":line})
+    try:
+        with upload_source(uploaded) as src:
+            for done, total, page in extract.iter_blocks(src, uploaded.name, pages, PDF_MAX_PAGES, PDF_WORKERS,
+                                                          PDF_PARALLEL_MIN, PDF_OCR, DOC_MAX_CHARS):
+                blocks += page
+                if on_page: on_page(blocks, done, total)
+    except Exception as e:
+        st.error(f"Extraction error: {e}")
+        return blocks
+    if sum(len(b["text"]) for b in blocks) >= DOC_MAX_CHARS:
+        st.warning(f"ஆவணம் சுருக்கப்பட்டது | Only the first {DOC_MAX_CHARS:,} characters were read")
+    DCACHE.put(key, blocks)
     return blocks
 
-def extract_txt(data):
-    for enc in ("utf-8","utf-16","latin-1"):
-        try:
-            text = data.decode(enc); break
-        except Exception:
-            pass
-    else:
-        text = data.decode("utf-8", errors="replace")
-    return [{"type":"para","text":l.strip()} for l in text.splitlines() if l.strip()]
+def doc_card_html(title, meta, blocks):
+    return f"""
+    <div class="gov-doc-card">
+      <div class="gov-doc-titlebar">
+        <span class="gov-doc-filename">{title}</span>
+        <span class="gov-doc-meta">{meta}</span>
+      </div>
+      <div class="gov-doc-body">
+        <div class="doc-content">{blocks_to_html(blocks)}</div>
+      </div>
+    </div>"""
 
-def extract_document(uploaded):
-    data = uploaded.read()
-    name = uploaded.name.lower()
-    try:
-        if name.endswith(".docx"):   return extract_docx(data)
-        elif name.endswith(".pdf"):  return extract_pdf(data)
-        else:                        return extract_txt(data)
-    except Exception as e:
-        st.error(f"Extraction error: {e}"); return []
+def streaming_preview(name):
+    """on_page callback showing the pages read so far, redrawn at most twice a second."""
+    bar, view, last = st.progress(0.0), st.empty(), [0.0]
+    def on_page(blocks, done, total):
+        bar.progress(done / total, text=f"பக்கம் {done}/{total} | Page {done} of {total}")
+        if done == total or time.monotonic() - last[0] > 0.5:
+            last[0] = time.monotonic()
+            view.markdown(doc_card_html(name, f"{done}/{total} பக்கங்கள் · படிக்கிறது…", blocks),
+                          unsafe_allow_html=True)
+    on_page.clear = lambda: (bar.empty(), view.empty())
+    return on_page
 
 def tokenize_html(text):
     parts = []
@@ -495,83 +523,33 @@ def blocks_to_html(blocks):
             out.append(f'<div class="doc-para">{txt}</div>')
     return "\n".join(out)
 
-def tier2_json(word):
-    w = clean_word(word)
-    if w in TDICT:
-        e = TDICT[w]
-        return {"english":e.get("english",""),"tamil":e.get("tamil",""),
-                "example":e.get("example",""),"tier":2,"label":"உள்ளக அகராதி"}
-    for n in (1,2):
-        s = w[:-n]
-        if len(s) >= 2 and s in TDICT:
-            e = TDICT[s]
-            return {"english":e.get("english","")+" (வேர்ச்சொல்)","tamil":e.get("tamil",""),
-                    "example":e.get("example",""),"tier":2,"label":"அகராதி (வேர்)"}
-    return None
-
-@st.cache_data(ttl=3600, show_spinner=False)
-def _dict_api(en_word):
-    import requests
-    SKIP = {"the","a","an","to","of","in","on","at","it","is","be","as","this","that","was","are"}
-    words = [w for w in en_word.lower().split() if w not in SKIP]
-    if not words: return ""
-    try:
-        r = requests.get(f"https://api.dictionaryapi.dev/api/v2/entries/en/{words[0]}", timeout=6)
-        if r.status_code == 200:
-            for entry in r.json():
-                for m in entry.get("meanings",[]):
-                    for d in m.get("definitions",[]):
-                        txt = d.get("definition","")
-                        BAD = ("with a comp","used to","(used","an article","a function word",
-                               "expressing","indicates","denoting","refers to")
-                        if txt and not any(txt.lower().startswith(b) for b in BAD) and len(txt)>15:
-                            return txt[:240]
-    except Exception: pass
-    return ""
-
-@st.cache_data(ttl=3600, show_spinner=False)
-def tier3_chain(word):
-    try:
-        from deep_translator import GoogleTranslator
-        en = GoogleTranslator(source="ta", target="en").translate(word)
-        if not en: return None
-        defn = _dict_api(en)
-        ta_defn = ""
-        if defn:
-            try: ta_defn = GoogleTranslator(source="en", target="ta").translate(defn[:200])
-            except Exception: pass
-        return {"english":en,"tamil":ta_defn or "","definition":defn,"example":"","tier":3,"label":"🔗 மொழிபெயர்ப்பு"}
-    except Exception: return None
-
-@st.cache_resource(show_spinner=False)
-def _ml_pipe():
-    try:
-        from transformers import pipeline
-        return pipeline("translation", model="Helsinki-NLP/opus-mt-ta-en", device=-1)
-    except Exception: return None
-
-@st.cache_data(ttl=3600, show_spinner=False)
-def tier4_ml(word):
-    pipe = _ml_pipe()
-    if not pipe: return None
-    try:
-        res = pipe(word, max_length=128)
-        en = res[0].get("translation_text","") if res else ""
-        if not en: return None
-        return {"english":en,"tamil":"","definition":_dict_api(en),"example":"","tier":4,"label":"🤖 நரம்பு வலை"}
-    except Exception: return None
-
-def lookup(word):
-    word = word.strip()
-    if not word: return {"english":"","tamil":"","tier":0,"label":""}
-    r = tier2_json(word)
-    if r: return r
-    r = tier3_chain(word)
-    if r: return r
-    r = tier4_ml(word)
-    if r: return r
-    return {"english":"பொருள் கண்டுபிடிக்கவில்லை","tamil":"Meaning not found",
-            "definition":"","example":"","tier":0,"label":"கண்டுபிடிக்கவில்லை"}
+def start_prefetch(blocks):
+    """Resolve the document's non-dictionary words in the background, most frequent first."""
+    old = st.session_state.get("prefetch")
+    if old: old.cancel()
+    counts = Counter(clean_word(t) for b in blocks for t in b["text"].split() if is_tamil_word(t))
+    words  = Counter({w: n for w, n in counts.items() if w and not tier2_json(w)})   # each word checked once
+    st.session_state.prefetch = prefetch.Prefetcher(
+        words, lookup_many, batch=PREFETCH_BATCH, workers=PREFETCH_WORKERS, per_sec=PREFETCH_RATE,
+        initializer=lambda: ratelimit.priority.set(ratelimit.BACKGROUND),   # clicks get upstream tokens first
+    ) if words and st.session_state.get("prefetch_on", PREFETCH_ON) else None
+
+def prefetch_progress():
+    """Progress bar that redraws itself every second while the prefetch runs."""
+    pf = st.session_state.get("prefetch")
+    if not pf or not pf.total: return
+    st.session_state.prefetch_ticking = not pf.finished
+    st.fragment(_prefetch_bar, run_every=None if pf.finished else 1)()
+
+def _prefetch_bar():
+    pf = st.session_state.get("prefetch")
+    if not pf or not pf.total: return
+    lbl = "முடிந்தது" if pf.finished else "பின்னணியில் பொருள் தேடுகிறது…"
+    st.progress(min(1.0, pf.done / pf.total),
+                text=f"{lbl} | Prefetch {pf.done:,}/{pf.total:,}" + (f" · {pf.failed} தோல்வி" if pf.failed else ""))
+    if pf.finished and st.session_state.get("prefetch_ticking"):
+        st.session_state.prefetch_ticking = False
+        st.rerun()                        # one full run re-registers the fragment without its timer
 
 def meaning_card_html(word, r):
     tier = r.get("tier",0)
@@ -587,6 +565,9 @@ def meaning_card_html(word, r):
     def_sec = (f'<div class="mcard-sec-lbl">வரையறை | Definition</div>'
                f'<div class="mcard-def">{defn}</div>') if defn and defn != en and len(defn)>12 else ""
     ex_sec = f'<div class="mcard-ex"> {ex}</div>' if ex else ""
+    near   = [r["match"]] + r.get("suggestions", []) if r.get("match") else []
+    near_sec = (f'<div class="mcard-sec-lbl">நெருங்கிய சொற்கள் | Did you mean</div>'
+                f'<div class="mcard-ta">{" · ".join(near)}</div>') if near else ""
 
     return f"""
     <div class="mcard">
@@ -595,248 +576,31 @@ def meaning_card_html(word, r):
         <span class="tier-badge {tcls}">{lbl} · நிலை {tier}</span>
         <div class="mcard-sec-lbl">ஆங்கில பொருள் | English</div>
         <div class="mcard-en">{en}</div>
-        {ta_sec}{def_sec}{ex_sec}
+        {near_sec}{ta_sec}{def_sec}{ex_sec}
       </div>
     </div>"""
 
+SUGG_NONE = "— பரிந்துரைகள் —"
+
+def pick_suggestion():
+    """Show a picked suggestion once, then reset the box so a stale pick never overrides later clicks."""
+    pick = st.session_state.sugg_pick
+    if pick == SUGG_NONE: return
+    st.session_state.sel_word  = pick
+    st.session_state.meaning   = lookup(pick)
+    st.session_state.sugg_pick = SUGG_NONE
+    if pick not in st.session_state.history:
+        st.session_state.history.insert(0, pick)
+        st.session_state.history = st.session_state.history[:20]
+
+def dict_entry_expander(wk):
+    wd = TDICT[wk]
+    en = (wd.get("english","") or wd.get("meaning",""))[:35]
+    with st.expander(f"{wk} — {en}"):
+        st.markdown(meaning_card_html(wk,{**wd,"tamil":wd.get("tamil","") or wd.get("meaning",""),
+                                          "tier":2,"label":" உள்ளக அகராதி"}),
+                    unsafe_allow_html=True)
 
-def get_tamil_sentences(text):
-    """
-    Split Tamil text into sentence units.
-    For Tamil legal docs, each line/block is a natural sentence unit.
-    Also splits within lines on Tamil + standard punctuation.
-    """
-    line_sents = [l.strip() for l in text.splitlines() if l.strip()]
-    final = []
-    for line in line_sents:
-        sub = re.split(r'[।॥\u0964\u0965\.\!\?;]+', line)
-        for s in sub:
-            s = s.strip()
-            if len(s) > 5:
-                final.append(s)
-    seen, result = set(), []
-    for s in final:
-        if s not in seen:
-            seen.add(s)
-            result.append(s)
-    return result if result else [text.strip()]
-
-def score_sentence_tfidf(sentences):
-    """Score sentences using TF-IDF-like approach for Tamil."""
-    all_words = []
-    sent_words = []
-    for s in sentences:
-        words = [clean_word(w) for w in s.split() if is_tamil_word(w)]
-        sent_words.append(words)
-        all_words.extend(words)
-
-    total_docs = len(sentences)
-    word_doc_freq = Counter()
-    for sw in sent_words:
-        for w in set(sw):
-            word_doc_freq[w] += 1
-
-    total_word_freq = Counter(all_words)
-
-    scores = []
-    for i, sw in enumerate(sent_words):
-        if not sw:
-            scores.append(0.0)
-            continue
-        score = 0.0
-        for w in sw:
-            tf  = sw.count(w) / len(sw)
-            idf = math.log((total_docs + 1) / (word_doc_freq[w] + 1)) + 1
-            score += tf * idf
-        scores.append(score / len(sw))
-    return scores
-
-def score_sentence_position(sentences):
-    """Positional bias: first and last sentences score higher."""
-    n = len(sentences)
-    scores = []
-    for i in range(n):
-        if i == 0 or i == n - 1:
-            scores.append(1.0)
-        elif i < n * 0.25:
-            scores.append(0.7)
-        elif i > n * 0.75:
-            scores.append(0.5)
-        else:
-            scores.append(0.3)
-    return scores
-
-def score_sentence_length(sentences):
-    """Prefer medium-length sentences, penalise very short/long."""
-    scores = []
-    for s in sentences:
-        wc = len(s.split())
-        if 8 <= wc <= 25:
-            scores.append(1.0)
-        elif 5 <= wc < 8:
-            scores.append(0.6)
-        elif wc > 25:
-            scores.append(0.7)
-        else:
-            scores.append(0.3)
-    return scores
-
-def extractive_summarize(text, ratio=0.4, method="hybrid"):
-    """
-    Extractive summarization with three methods:
-      - tfidf    : TF-IDF scoring
-      - position : positional lead-bias
-      - hybrid   : weighted blend
-    Returns (summary_text, selected_indices, all_scores_dict).
-    """
-    sentences = get_tamil_sentences(text)
-    n = len(sentences)
-
-    if n == 0:
-        return text, [], {}
-    if n <= 3:
-        return text, list(range(n)), {}
-    n_select = max(3, min(n - 1, round(n * ratio)))
-
-    tfidf_scores    = score_sentence_tfidf(sentences)
-    position_scores = score_sentence_position(sentences)
-    length_scores   = score_sentence_length(sentences)
-
-    if method == "tfidf":
-        final_scores = tfidf_scores
-    elif method == "position":
-        final_scores = position_scores
-    else:  # hybrid
-        final_scores = [
-            0.5 * t + 0.3 * p + 0.2 * l
-            for t, p, l in zip(tfidf_scores, position_scores, length_scores)
-        ]
-
-    ranked = sorted(range(len(sentences)), key=lambda i: final_scores[i], reverse=True)
-    selected = sorted(ranked[:n_select])
-    summary  = " ".join(sentences[i] for i in selected)
-
-    scores_dict = {
-        "tfidf":    tfidf_scores,
-        "position": position_scores,
-        "length":   length_scores,
-        "final":    final_scores,
-    }
-    return summary, selected, scores_dict
-
-def abstractive_summarize_ai(text, length_hint="medium"):
-    """Call Anthropic API to generate a Tamil abstractive summary."""
-    import requests
-
-    length_map = {
-        "short":  "2–3 sentences",
-        "medium": "4–6 sentences",
-        "long":   "8–10 sentences",
-    }
-    length_desc = length_map.get(length_hint, "4–6 sentences")
-
-    prompt = (
-        f"நீங்கள் ஒரு தமிழ் மொழி நிபுணர். கீழே கொடுக்கப்பட்ட தமிழ் ஆவண உரையை "
-        f"படிக்கவும். இந்த உரையில் உள்ள அனைத்து முக்கிய கருத்துக்களையும், "
-        f"தகவல்களையும், நபர்களையும், நிபந்தனைகளையும் உள்ளடக்கிய "
-        f"விரிவான சுருக்கம் எழுதுங்கள். "
-        f"சுருக்கம் {length_desc} இருக்க வேண்டும். "
-        f"சுருக்கம் மட்டும் தமிழில் எழுதுங்கள், வேறு எந்த மொழியிலும் வேண்டாம். "
-        f"முன்னுரை அல்லது 'சுருக்கம்:' என்று தொடங்க வேண்டாம், நேரடியாக எழுதுங்கள்.\n\n"
-        f"உரை:\n{text[:4000]}\n\n"
-        f"சுருக்கம்:"
-    )
-
-    try:
-        resp = requests.post(
-            "https://api.anthropic.com/v1/messages",
-            headers={"Content-Type": "application/json"},
-            json={
-                "model": "claude-sonnet-4-20250514",
-                "max_tokens": 1000,
-                "messages": [{"role": "user", "content": prompt}],
-            },
-            timeout=30,
-        )
-        data = resp.json()
-        text_out = ""
-        for block in data.get("content", []):
-            if block.get("type") == "text":
-                text_out += block["text"]
-        return text_out.strip() if text_out else None
-    except Exception as e:
-        return None
-
-
-def get_ngrams(tokens, n):
-    return Counter(tuple(tokens[i:i+n]) for i in range(len(tokens)-n+1))
-
-def rouge_n(reference_tokens, summary_tokens, n=1):
-    ref_ng = get_ngrams(reference_tokens, n)
-    sum_ng = get_ngrams(summary_tokens, n)
-    if not ref_ng or not sum_ng:
-        return 0.0
-    overlap = sum(min(ref_ng[k], sum_ng[k]) for k in sum_ng)
-    recall  = overlap / sum(ref_ng.values())
-    precision = overlap / sum(sum_ng.values())
-    if precision + recall == 0:
-        return 0.0
-    f1 = 2 * precision * recall / (precision + recall)
-    return round(f1 * 100, 1)
-
-def lcs_length(a, b):
-    m, n = len(a), len(b)
-    dp = [[0]*(n+1) for _ in range(2)]
-    for i in range(1, m+1):
-        for j in range(1, n+1):
-            if a[i-1] == b[j-1]:
-                dp[i%2][j] = dp[(i-1)%2][j-1] + 1
-            else:
-                dp[i%2][j] = max(dp[(i-1)%2][j], dp[i%2][j-1])
-    return dp[m%2][n]
-
-def rouge_l(reference_tokens, summary_tokens):
-    if not reference_tokens or not summary_tokens:
-        return 0.0
-    lcs = lcs_length(reference_tokens, summary_tokens)
-    recall    = lcs / len(reference_tokens)
-    precision = lcs / len(summary_tokens)
-    if precision + recall == 0:
-        return 0.0
-    f1 = 2 * precision * recall / (precision + recall)
-    return round(f1 * 100, 1)
-
-def compression_ratio(original_text, summary_text):
-    orig_wc = len(original_text.split())
-    sum_wc  = len(summary_text.split())
-    if orig_wc == 0:
-        return 0.0
-    ratio = (1 - sum_wc / orig_wc) * 100
-    return round(max(0.0, min(100.0, ratio)), 1)
-
-def keyword_coverage(original_text, summary_text, top_n=15):
-    orig_words = [clean_word(w) for w in original_text.split() if is_tamil_word(w)]
-    sum_words  = set(clean_word(w) for w in summary_text.split() if is_tamil_word(w))
-    if not orig_words:
-        return 0.0, [], []
-    freq = Counter(orig_words)
-    top_kws = [w for w, _ in freq.most_common(top_n) if len(w) > 2]
-    covered = [w for w in top_kws if w in sum_words]
-    score   = round(len(covered) / len(top_kws) * 100, 1) if top_kws else 0.0
-    return score, top_kws, covered
-
-def lexical_diversity(text):
-    words = [clean_word(w) for w in text.split() if is_tamil_word(w)]
-    if len(words) < 3:
-        return 0.0
-    return round(len(set(words)) / len(words) * 100, 1)
-
-def avg_sentence_length(text):
-    sents = get_tamil_sentences(text)
-    if not sents:
-        return 0
-    total = sum(len(s.split()) for s in sents)
-    return round(total / len(sents), 1)
 
 def grade_score(score):
     if score >= 75: return "A", "grade-A"
@@ -844,40 +608,6 @@ def grade_score(score):
     if score >= 35: return "C", "grade-C"
     return "D", "grade-D"
 
-def evaluate_summary(original_text, summary_text, method_label=""):
-    orig_toks = [clean_word(w) for w in original_text.split() if is_tamil_word(w)]
-    sum_toks  = [clean_word(w) for w in summary_text.split() if is_tamil_word(w)]
-
-    r1  = rouge_n(orig_toks, sum_toks, 1)
-    r2  = rouge_n(orig_toks, sum_toks, 2)
-    rl  = rouge_l(orig_toks, sum_toks)
-    cr  = compression_ratio(original_text, summary_text)
-    kc, top_kws, covered_kws = keyword_coverage(original_text, summary_text)
-    ld_orig = lexical_diversity(original_text)
-    ld_sum  = lexical_diversity(summary_text)
-    asl_sum = avg_sentence_length(summary_text)
-    n_sents_orig = len(get_tamil_sentences(original_text))
-    n_sents_sum  = len(get_tamil_sentences(summary_text))
-
-    overall = round((r1 * 0.3 + r2 * 0.2 + rl * 0.2 + kc * 0.3), 1)
-
-    return {
-        "rouge_1": r1,
-        "rouge_2": r2,
-        "rouge_l": rl,
-        "compression_ratio": cr,
-        "keyword_coverage": kc,
-        "lexical_diversity_orig": ld_orig,
-        "lexical_diversity_sum":  ld_sum,
-        "avg_sent_len": asl_sum,
-        "n_sents_orig": n_sents_orig,
-        "n_sents_sum":  n_sents_sum,
-        "top_keywords": top_kws,
-        "covered_keywords": covered_kws,
-        "overall": overall,
-        "method": method_label,
-    }
-
 def _grade_color(score):
     if score >= 75: return ("#d4edda","#155724","#b8ddc4","A")
     if score >= 55: return ("#d1ecf1","#0c5460","#bee5eb","B")
@@ -969,9 +699,10 @@ def render_metrics_panel(metrics):
     )
 
 for k,v in [("blocks",[]),("sel_word",""),("meaning",None),
-            ("history",[]),("fname",""),("paste_blocks",[]),
+            ("history",[]),("fname",""),("doc_key",None),("paste_blocks",[]),
             ("summary_text",""),("summary_metrics",None),
-            ("summary_method",""),("summary_generated",False)]:
+            ("summary_method",""),("summary_generated",False),
+            ("reverse_q",""),("reverse_hits",[]),("prefetch",None)]:
     if k not in st.session_state:
         st.session_state[k] = v
 
@@ -1106,6 +837,41 @@ with col_l:
     </div>
     """, unsafe_allow_html=True)
 
+    cs = LCACHE.stats()
+    rs = race_stats()
+    coalesced = sum(f.coalesced for f in resilience.flights().values())
+    br_rows = "".join(
+        f'<div class="gov-stat-row"><span class="gov-stat-label">{n}</span>'
+        f'<span class="gov-stat-val">{breaker(n).state} · {breaker(n).trips:,}</span></div>'
+        for n in ("translator", "dict_api", "ml"))
+    tier_rows = "".join(
+        f'<div class="gov-stat-row"><span class="gov-stat-label">{lbl} வெற்றி / தவறல்</span>'
+        f'<span class="gov-stat-val">{cs["hits"].get(t, 0):,} / {cs["misses"].get(t, 0):,}</span></div>'
+        for t, lbl in (("tier3", "அடுக்கு 3"), ("tier4", "அடுக்கு 4"), ("miss", "இல்லை")))
+    st.markdown(f"""
+    <div class="gov-sidebar-head"> தேடல் சேமிப்பகம் | Lookup Cache</div>
+    <div class="gov-sidebar-body">
+      <div class="gov-stat-row">
+        <span class="gov-stat-label">சேமித்தவை</span>
+        <span class="gov-stat-val">{cs['rows']:,}</span>
+      </div>
+      {tier_rows}
+      <div class="gov-stat-row">
+        <span class="gov-stat-label">நீக்கப்பட்டவை</span>
+        <span class="gov-stat-val">{cs['evictions']:,}</span>
+      </div>
+      <div class="gov-stat-row">
+        <span class="gov-stat-label">வென்ற அடுக்கு 3 / 4 / காலாவதி</span>
+        <span class="gov-stat-val">{rs['tier3']:,} / {rs['tier4']:,} / {rs['timeout']:,}</span>
+      </div>
+      <div class="gov-stat-row">
+        <span class="gov-stat-label">இணைக்கப்பட்ட கோரிக்கைகள்</span>
+        <span class="gov-stat-val">{coalesced:,}</span>
+      </div>
+      {br_rows}
+    </div>
+    """, unsafe_allow_html=True)
+
     if st.session_state.summary_generated and st.session_state.summary_metrics:
         m = st.session_state.summary_metrics
         st.markdown(f"""
@@ -1178,25 +944,43 @@ with col_c:
             "PDF, DOCX, TXT", type=["pdf","docx","txt"],
             label_visibility="collapsed", key="uploader",
         )
+        st.checkbox("பின்னணியில் பொருள் முன்தேடல் | Prefetch meanings after upload",
+                    value=PREFETCH_ON, key="prefetch_on")
+        if uploaded and uploaded.name.lower().endswith(".pdf"):
+            pc1, pc2 = st.columns(2)
+            first = pc1.number_input("முதல் பக்கம் | From page", min_value=1, value=1, key="pdf_first")
+            last  = pc2.number_input("கடைசி பக்கம் | To page (0 = end)", min_value=0, value=0, key="pdf_last")
+            pages = (int(first), int(last))
+        else:
+            pages = None
         st.markdown('</div>', unsafe_allow_html=True)
 
+        if uploaded and uploaded.size > UPLOAD_MAX_MB << 20:
+            st.error(f"கோப்பு மிகப் பெரியது | File is larger than {UPLOAD_MAX_MB} MB")
+            uploaded = None
         if uploaded:
-            if uploaded.name != st.session_state.fname:
-                with st.spinner("ஆவணம் படிக்கிறது… | Reading document…"):
-                    blocks = extract_document(uploaded)
-                    st.session_state.blocks           = blocks
-                    st.session_state.fname            = uploaded.name
-                    st.session_state.sel_word         = ""
-                    st.session_state.meaning          = None
-                    st.session_state.paste_blocks     = []
-                    st.session_state.summary_text     = ""
-                    st.session_state.summary_metrics  = None
-                    st.session_state.summary_generated= False
+            digest  = upload_digest(uploaded)
+            doc_key = (digest, pages)
+            if doc_key != st.session_state.doc_key:
+                preview = streaming_preview(uploaded.name)
+                blocks  = extract_document(uploaded, digest, pages, on_page=preview)
+                preview.clear()
+                st.session_state.blocks           = blocks
+                st.session_state.doc_key          = doc_key
+                st.session_state.fname            = uploaded.name
+                st.session_state.sel_word         = ""
+                st.session_state.meaning          = None
+                st.session_state.paste_blocks     = []
+                st.session_state.summary_text     = ""
+                st.session_state.summary_metrics  = None
+                st.session_state.summary_generated= False
+                start_prefetch(blocks)
 
             blocks  = st.session_state.blocks
             all_txt = " ".join(b["text"] for b in blocks)
             tw_list = [clean_word(t) for t in all_txt.split() if is_tamil_word(t)]
             tw_u    = list(dict.fromkeys(w for w in tw_list if w))
+            prefetch_progress()
 
             st.markdown(f"""
             <div class="stats-grid">
@@ -1205,18 +989,8 @@ with col_c:
               <div class="stat-box"><span class="stat-num">{len(tw_u):,}</span><span class="stat-lbl">தமிழ் சொற்கள்</span></div>
               <div class="stat-box"><span class="stat-num">{sum(1 for w in tw_u if tier2_json(w)):,}</span><span class="stat-lbl">அகராதியில்</span></div>
             </div>
-            <div class="gov-doc-card">
-              <div class="gov-doc-titlebar">
-                <span class="gov-doc-filename">{uploaded.name}</span>
-                <span class="gov-doc-meta">
-                  {len(blocks)} பகுதிகள் · {len(tw_u)} தமிழ் சொற்கள் ·
-                  <span style="color:#1a6b2e">●</span> தயார்
-                </span>
-              </div>
-              <div class="gov-doc-body">
-                <div class="doc-content">{blocks_to_html(blocks)}</div>
-              </div>
-            </div>
+            {doc_card_html(uploaded.name, f'{len(blocks)} பகுதிகள் · {len(tw_u)} தமிழ் சொற்கள் · '
+                                          f'<span style="color:#1a6b2e">●</span> தயார்', blocks)}
             <div style="text-align:center;margin-top:.4rem;font-size:.72rem;color:#7a8a99;font-family:'Noto Sans Tamil',sans-serif">
                அடிக்கோடிட்ட தமிழ் சொற்களை கிளிக் செய்யவும் · "சுருக்கம்" தாவலில் சுருக்கம் காணுங்கள்
             </div>
@@ -1261,11 +1035,13 @@ with col_c:
                 st.session_state.summary_text     = ""
                 st.session_state.summary_metrics  = None
                 st.session_state.summary_generated= False
+                start_prefetch(blocks)
 
         if st.session_state.paste_blocks:
             pb  = st.session_state.paste_blocks
             pt  = " ".join(b["text"] for b in pb)
             ptw = list(dict.fromkeys(clean_word(t) for t in pt.split() if is_tamil_word(t)))
+            prefetch_progress()
             st.markdown(f"""
             <div class="stats-grid">
               <div class="stat-box"><span class="stat-num">{len(pb)}</span><span class="stat-lbl">வரிகள்</span></div>
@@ -1479,12 +1255,27 @@ with col_r:
     st.markdown('<div class="gov-meaning-head"> சொல் பொருள் | Word Meaning</div>', unsafe_allow_html=True)
 
     st.markdown('<div style="padding:.6rem .5rem .3rem"><div class="gov-search-label">🔍 சொல் தேடல் | Search Word</div></div>', unsafe_allow_html=True)
+    search_mode = st.radio(
+        "தேடல் வகை", ["word","reverse"],
+        format_func=lambda x: {"word":"சொல் | Word","reverse":"பொருள் / இணைச்சொல் | Reverse"}[x],
+        horizontal=True, key="search_mode", label_visibility="collapsed",
+    )
     manual = st.text_input(
         "சொல்", placeholder="e.g. அன்பு, வாடகை, உரிமை…",
         key="manual_input", label_visibility="collapsed",
     )
+    sugg = (TTRIE.complete(clean_word(manual), limit=8, partial=True)
+            if search_mode == "word" and clean_word(manual) else [])
+    if sugg and sugg != [clean_word(manual)]:
+        st.selectbox(
+            "பரிந்துரைகள்", [SUGG_NONE] + sugg,
+            key="sugg_pick", label_visibility="collapsed", on_change=pick_suggestion,
+        )
     if st.button("தேடு | Search", key="search_btn"):
-        if manual.strip():
+        if manual.strip() and search_mode == "reverse":
+            st.session_state.reverse_q    = manual.strip()
+            st.session_state.reverse_hits = TREV.search(manual) if TREV else []
+        elif manual.strip():
             w = manual.strip()
             with st.spinner("தேடுகிறது…"):
                 st.session_state.meaning  = lookup(w)
@@ -1495,6 +1286,12 @@ with col_r:
 
     st.markdown('<div style="padding:0 .5rem">', unsafe_allow_html=True)
 
+    if search_mode == "reverse" and st.session_state.reverse_q:
+        hits = st.session_state.reverse_hits
+        st.caption(f"“{st.session_state.reverse_q}” — {len(hits):,} சொற்கள்")
+        for wk in hits[:10]:
+            dict_entry_expander(wk)
+
     if st.session_state.sel_word and st.session_state.meaning:
         st.markdown(meaning_card_html(st.session_state.sel_word, st.session_state.meaning),
                     unsafe_allow_html=True)
@@ -1527,16 +1324,18 @@ with col_r:
 
     st.markdown('<div style="margin-top:.6rem"><div class="gov-search-label">அகராதி | Dictionary Browse</div></div>', unsafe_allow_html=True)
     if TDICT:
-        letters = sorted({w[0] for w in TDICT if w})
-        pick_l  = st.selectbox("எழுத்தால் தேடு", ["எல்லாம்"] + letters,
+        letters = dict(TTRIE.letters())
+        pick_l  = st.selectbox("எழுத்தால் தேடு", ["எல்லாம்"] + list(letters),
+                               format_func=lambda g: g if g == "எல்லாம்" else f"{g} ({letters[g]})",
                                key="browse_letter", label_visibility="collapsed")
-        filtered = {k:v for k,v in TDICT.items() if pick_l=="எல்லாம்" or k.startswith(pick_l)}
-        st.caption(f"{len(filtered):,} சொற்கள்")
-        for wk, wd in list(filtered.items())[:6]:
-            en = wd.get("english","")[:35]
-            with st.expander(f"{wk} — {en}"):
-                st.markdown(meaning_card_html(wk,{**wd,"tier":2,"label":" உள்ளக அகராதி"}),
-                            unsafe_allow_html=True)
+        prefix  = "" if pick_l == "எல்லாம்" else pick_l
+        n_match = TTRIE.count(prefix)
+        n_pages = max(1, math.ceil(n_match / BROWSE_PAGE))
+        page = st.number_input("பக்கம்", min_value=1, max_value=n_pages, value=1,
+                               key=f"browse_page_{prefix}", label_visibility="collapsed") if n_pages > 1 else 1
+        st.caption(f"{n_match:,} சொற்கள் · பக்கம் {page}/{n_pages}")
+        for wk in TTRIE.complete(prefix, offset=(page - 1) * BROWSE_PAGE, limit=BROWSE_PAGE):
+            dict_entry_expander(wk)
 
     st.markdown('</div>', unsafe_allow_html=True)
 st.markdown("""
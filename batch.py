@@ -0,0 +1,126 @@
+"""
+Offline batch mode: extract, summarize and evaluate every PDF / DOCX / TXT file
+under a directory on a process pool, streaming one row per file to JSONL or CSV.
+
+    python batch.py circulars/ -o results.jsonl --workers 8
+    python batch.py circulars/ -o results.csv --resume     # skip files already done
+
+Rows carry per-stage timings. With --resume, files that already have a row
+without an error are skipped and new rows are appended, so an interrupted run
+picks up where it stopped.
+"""
+import csv, json, os, sys, time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from pathlib import Path
+import extract, summarize, tdict
+
+FIELDS = ["path", "bytes", "blocks", "words", "tamil_words", "dict_coverage", "summary",
+          "overall", "rouge_1", "rouge_2", "rouge_l", "compression_ratio", "keyword_coverage",
+          "extract_s", "summarize_s", "evaluate_s", "total_s", "error"]
+
+
+@lru_cache(maxsize=None)
+def dictionary():
+    """The headword index for the coverage count, opened once per worker (engine would load every lookup tier)."""
+    src = [p for p in tdict.SOURCES if p.exists()]
+    return tdict.open_index(src, tdict.INDEX) if src else {}
+
+
+def process(path, ratio=0.4, method="hybrid"):
+    """One output row for the document at `path`; failures are reported in "error"."""
+    row = {"path": str(path), "error": ""}
+    t0 = time.perf_counter()
+    try:
+        row["bytes"] = Path(path).stat().st_size
+        blocks = extract.extract(str(path), str(path), use_ocr=True)
+        t1 = time.perf_counter()
+        text = "\n".join(b["text"] for b in blocks)
+        summary, _, _ = summarize.extractive_summarize(text, ratio, method)
+        t2 = time.perf_counter()
+        ev = summarize.evaluate_summary(text, summary, method)
+        t3 = time.perf_counter()
+        words = [summarize.clean_word(w) for w in text.split() if summarize.is_tamil_word(w)]
+        known = sum(1 for w in words if w in dictionary())
+        row.update(blocks=len(blocks), words=len(text.split()), tamil_words=len(words),
+                   dict_coverage=round(100 * known / len(words), 1) if words else 0.0, summary=summary,
+                   **{k: ev[k] for k in ("overall", "rouge_1", "rouge_2", "rouge_l",
+                                         "compression_ratio", "keyword_coverage")},
+                   extract_s=round(t1 - t0, 3), summarize_s=round(t2 - t1, 3), evaluate_s=round(t3 - t2, 3))
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    row["total_s"] = round(time.perf_counter() - t0, 3)
+    return {k: row[k] for k in FIELDS if k in row}
+
+
+def find_documents(root):
+    return sorted(p for p in Path(root).rglob("*") if p.is_file() and p.suffix.lower() in extract.SUFFIXES)
+
+
+def finished(out_path, fmt):
+    """Paths that already have an error-free row in `out_path`."""
+    if not out_path.exists():
+        return set()
+    with open(out_path, encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            rows = csv.DictReader(f)
+        else:
+            rows = []
+            for line in f:
+                try: rows.append(json.loads(line))
+                except ValueError: pass       # a line cut short by the interruption
+    return {r["path"] for r in rows if r.get("path") and not r.get("error")}
+
+
+class _Writer:
+    def __init__(self, out_path, fmt, append):
+        new = not (append and out_path.exists() and out_path.stat().st_size)
+        self.f = open(out_path, "a" if append else "w", encoding="utf-8", newline="")
+        self.csv = csv.DictWriter(self.f, FIELDS, extrasaction="ignore") if fmt == "csv" else None
+        if self.csv and new:
+            self.csv.writeheader()
+
+    def write(self, row):
+        if self.csv: self.csv.writerow(row)
+        else: self.f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+
+def run(root, out_path, fmt=None, workers=None, ratio=0.4, method="hybrid", resume=False, log=sys.stderr):
+    out_path = Path(out_path)
+    fmt  = fmt or ("csv" if out_path.suffix.lower() == ".csv" else "jsonl")
+    done = finished(out_path, fmt) if resume else set()
+    todo = [p for p in find_documents(root) if str(p) not in done]
+    print(f"{len(todo)} files to process ({len(done)} already done)", file=log)
+    writer, start, errors = _Writer(out_path, fmt, resume), time.perf_counter(), 0
+    try:
+        with ProcessPoolExecutor(workers or os.cpu_count()) as pool:
+            futs = [pool.submit(process, p, ratio, method) for p in todo]
+            for i, fut in enumerate(as_completed(futs), 1):
+                row = fut.result()
+                writer.write(row)
+                errors += bool(row["error"])
+                status = f"ERROR {row['error']}" if row["error"] else f"{row['total_s']:.2f}s"
+                print(f"[{i}/{len(todo)}] {row['path']} {status}", file=log)
+    finally:
+        writer.close()
+    wall = time.perf_counter() - start
+    print(f"{len(todo)} files, {errors} errors in {wall:.1f}s ({len(todo) / max(wall, 1e-9):.1f} files/s)", file=log)
+    return errors
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Summarize and evaluate a directory of Tamil documents.")
+    ap.add_argument("root", help="directory searched recursively for .pdf, .docx and .txt files")
+    ap.add_argument("-o", "--output", required=True, help="results file (.jsonl or .csv)")
+    ap.add_argument("--format", choices=("jsonl", "csv"), help="default: from the output file's extension")
+    ap.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    ap.add_argument("--ratio", type=float, default=0.4, help="share of sentences kept in the summary")
+    ap.add_argument("--method", choices=("hybrid", "tfidf", "position"), default="hybrid")
+    ap.add_argument("--resume", action="store_true", help="skip files that already have a row in the output")
+    args = ap.parse_args()
+    sys.exit(1 if run(args.root, args.output, args.format, args.workers, args.ratio, args.method, args.resume) else 0)
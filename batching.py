@@ -0,0 +1,57 @@
+"""
+Dynamic micro-batching for the tier 4 translation model.
+
+Callers on any thread submit one item and get a Future. A single worker thread
+takes the first waiting item, keeps collecting for up to `max_wait` seconds or
+until `max_batch` items, then runs them through `fn` as one padded batch and
+resolves each caller's future. Concurrent sessions share forward passes instead
+of queueing behind each other's; a lone caller pays at most `max_wait` extra.
+"""
+import queue, threading, time
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    def __init__(self, fn, max_batch=16, max_wait=0.008):
+        """`fn` maps a list of items to a list of results of the same length."""
+        self.fn, self.max_batch, self.max_wait = fn, max_batch, max_wait
+        self.batches = self.items = 0
+        self._q = queue.Queue()
+        threading.Thread(target=self._loop, name="micro-batcher", daemon=True).start()
+
+    def submit(self, item):
+        fut = Future()
+        self._q.put((item, fut))
+        return fut
+
+    def __call__(self, item, timeout=None):
+        return self.submit(item).result(timeout)
+
+    def _collect(self):
+        batch = [self._q.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                break
+            try:
+                batch.append(self._q.get(timeout=left))
+            except queue.Empty:
+                break
+        return [(item, fut) for item, fut in batch if fut.set_running_or_notify_cancel()]
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            if not batch:
+                continue
+            try:
+                results = self.fn([item for item, _ in batch])
+            except Exception as e:
+                for _, fut in batch:
+                    fut.set_exception(e)
+                continue
+            self.batches += 1
+            self.items   += len(batch)
+            for (_, fut), r in zip(batch, results):
+                fut.set_result(r)
@@ -0,0 +1,86 @@
+"""
+On-disk cache of extracted document blocks, keyed by the SHA-256 of the file's
+bytes (plus whatever extraction options the caller folds into the key).
+
+Entries are gzipped JSON files under `root`, written atomically, so every
+session and process on the host shares them and they survive restarts. When
+the directory grows past `max_bytes` the least recently used entries go first.
+"""
+import gzip, hashlib, json, os, threading
+from pathlib import Path
+
+
+def digest(data):
+    """SHA-256 hex of bytes, or of a binary file object read from the start in 1 MB chunks."""
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(data).hexdigest()
+    h = hashlib.sha256()
+    data.seek(0)
+    for chunk in iter(lambda: data.read(1 << 20), b""):
+        h.update(chunk)
+    return h.hexdigest()
+
+
+class DocCache:
+    def __init__(self, root, max_bytes=512 << 20):
+        self.root, self.max_bytes = Path(root), max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.hits = self.misses = self.evictions = 0
+        self._lock = threading.Lock()
+
+    def key(self, sha, *variant):
+        return hashlib.sha256(f"{sha}|{variant!r}".encode()).hexdigest()
+
+    def _path(self, key):
+        return self.root / f"{key}.json.gz"
+
+    def get(self, key):
+        p = self._path(key)
+        try:
+            with gzip.open(p, "rt", encoding="utf-8") as f:
+                blocks = json.load(f)
+            os.utime(p)                      # mtime doubles as last access for eviction
+        except (OSError, ValueError):
+            with self._lock: self.misses += 1
+            return None
+        with self._lock: self.hits += 1
+        return blocks
+
+    def put(self, key, blocks):
+        p = self._path(key)
+        tmp = p.with_name(f".{p.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=5) as f:
+                json.dump(blocks, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, p)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            return
+        self.evict()
+
+    def _entries(self):
+        out = []
+        for e in os.scandir(self.root):
+            if e.name.endswith(".json.gz"):
+                try: st = e.stat()
+                except OSError: continue
+                out.append((st.st_mtime, st.st_size, e.path))
+        return out
+
+    def evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            with self._lock: self.evictions += 1
+
+    def stats(self):
+        entries = self._entries()
+        return {"hits":self.hits, "misses":self.misses, "evictions":self.evictions,
+                "entries":len(entries), "bytes":sum(size for _, size, _ in entries)}
@@ -0,0 +1,423 @@
+"""
+Lookup, summarization and evaluation logic shared by the Streamlit UI (app.py)
+and the headless HTTP API (api.py). Nothing here depends on Streamlit: the
+dictionary indexes and model are loaded once per process and lookup results are
+cached in the persistent LookupCache, which every process on the host shares.
+"""
+import os, time, threading
+import tdict, morph, fuzzy, revindex, lookup_cache, batching, ml_backend, http_client, resilience, ratelimit, metrics
+from summarize import clean_word, is_tamil_word, extractive_summarize, evaluate_summary
+from pathlib import Path
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import wraps
+from urllib.parse import quote
+
+APP_DIR      = Path(__file__).parent
+DICT_SOURCES = tdict.SOURCES
+DICT_INDEX   = tdict.INDEX
+DICT_REVERSE = APP_DIR / "Tamil.rev.tdx"
+DICT_FUZZY   = APP_DIR / "Tamil.fuzzy.tdx"
+CACHE_DB     = Path(os.environ.get("TLA_CACHE_DB", APP_DIR / ".cache" / "lookups.sqlite3"))
+CACHE_TTL    = int(os.environ.get("TLA_CACHE_TTL", 7 * 86400))
+CACHE_ROWS   = int(os.environ.get("TLA_CACHE_ROWS", 100_000))
+TRANSLATE_BATCH_BYTES = int(os.environ.get("TLA_TRANSLATE_BATCH_BYTES", 6000))   # URL-encoded; text goes in a GET query
+ML_BATCH     = int(os.environ.get("TLA_ML_BATCH", 16))
+ML_WAIT_MS   = float(os.environ.get("TLA_ML_WAIT_MS", 8))
+ML_TIMEOUT   = float(os.environ.get("TLA_ML_TIMEOUT", 60))
+ML_BACKEND   = os.environ.get("TLA_ML_BACKEND", "torch")      # "torch" or "onnx"
+ONNX_DIR     = Path(os.environ.get("TLA_ONNX_DIR", APP_DIR / ".cache" / "opus-mt-ta-en-int8"))
+DICT_API_URL = os.environ.get("TLA_DICT_API_URL", "https://api.dictionaryapi.dev/api/v2/entries/en/")
+AI_API_URL   = os.environ.get("TLA_AI_API_URL", "https://api.anthropic.com/v1/messages")
+TRANSLATE_DEADLINE = float(os.environ.get("TLA_TRANSLATE_DEADLINE", 8))
+LOOKUP_BUDGET = float(os.environ.get("TLA_LOOKUP_BUDGET", 4))     # seconds; 0 runs tiers 3 and 4 in sequence
+HEDGE_DELAY   = float(os.environ.get("TLA_HEDGE_DELAY", 0.3))     # head start tier 3 gets before tier 4 joins
+NEG_TTL       = int(os.environ.get("TLA_NEG_TTL", 600))           # how long a word that missed every tier stays "not found" (0: off)
+BREAKER_FAILS    = int(os.environ.get("TLA_BREAKER_FAILS", 5))
+BREAKER_COOLDOWN = float(os.environ.get("TLA_BREAKER_COOLDOWN", 30))
+TRANSLATE_RATE   = float(os.environ.get("TLA_TRANSLATE_RATE", 5))     # requests / second
+DICT_API_RATE    = float(os.environ.get("TLA_DICT_API_RATE", 5))
+RATE_WAIT        = float(os.environ.get("TLA_RATE_WAIT", 10))        # longest wait for a token
+RATE_STATE_DIR   = os.environ.get("TLA_RATE_STATE_DIR")             # set to share the buckets host-wide
+METRICS_PORT  = int(os.environ.get("TLA_METRICS_PORT", 0))          # serve /metrics on this port
+METRICS_FILE  = os.environ.get("TLA_METRICS_FILE")                 # or rewrite this .prom file
+METRICS_EVERY = float(os.environ.get("TLA_METRICS_EVERY", 15))
+
+metrics.start(METRICS_PORT, METRICS_FILE, METRICS_EVERY)
+
+def _once(fn):
+    """Process-wide singleton: fn() runs once even when several threads ask before it returns."""
+    lock, box = threading.Lock(), []
+    @wraps(fn)
+    def get():
+        if not box:
+            with lock:
+                if not box: box.append(fn())
+        return box[0]
+    return get
+
+@_once
+def load_dict():
+    src = [p for p in DICT_SOURCES if p.exists()]
+    if not src: return {}
+    return tdict.open_index(src, DICT_INDEX)
+
+TDICT = load_dict()
+
+@_once
+def load_trie():
+    d = load_dict()
+    return tdict.PrefixIndex(d) if isinstance(d, tdict.DictIndex) else tdict.PrefixTrie(d)
+
+TTRIE = load_trie()
+
+@_once
+def load_fuzzy():
+    """Deletion index for near matches; opened on the first dictionary miss, not at import."""
+    d = load_dict()
+    return fuzzy.open_fuzzy(d, DICT_FUZZY) if isinstance(d, tdict.DictIndex) else fuzzy.FuzzyIndex(d)
+
+@_once
+def load_reverse():
+    d = load_dict()
+    return revindex.open_reverse(d, DICT_REVERSE) if isinstance(d, tdict.DictIndex) else None
+
+TREV = load_reverse()
+
+@_once
+def load_lookup_cache():
+    return lookup_cache.LookupCache(CACHE_DB, ttl=CACHE_TTL, max_rows=CACHE_ROWS)
+
+LCACHE = load_lookup_cache()
+
+def _dict_result(e, label, en_note=""):
+    return {"english":e.get("english","")+en_note,"tamil":e.get("tamil","") or e.get("meaning",""),
+            "example":e.get("example",""),"tier":2,"label":label}
+
+@metrics.timed("tier2_json", outcome=metrics.hit_or_miss)
+def tier2_json(word):
+    w = clean_word(word)
+    if w in TDICT:
+        return _dict_result(TDICT[w], "உள்ளக அகராதி")
+    for s in morph.stems(w):
+        if s in TDICT:
+            return _dict_result(TDICT[s], "அகராதி (வேர்)", " (வேர்ச்சொல்)")
+    return None
+
+@metrics.timed("tier2_fuzzy", outcome=metrics.hit_or_miss)
+def tier2_fuzzy(word):
+    hits = load_fuzzy().lookup(clean_word(word))
+    if not hits: return None
+    best = hits[0][0]
+    return {**_dict_result(TDICT[best], "அகராதி (நெருங்கிய சொல்)"),
+            "match":best, "suggestions":[w for w, _ in hits[1:]]}
+
+@LCACHE.cached("dict_api")
+def _dict_api(en_word):
+    """English definition, "" if there is none. Raises when the API itself fails, so that is not cached."""
+    SKIP = {"the","a","an","to","of","in","on","at","it","is","be","as","this","that","was","are"}
+    words = [w for w in en_word.lower().split() if w not in SKIP]
+    if not words: return ""
+    r = breaker("dict_api").call(_dict_get, words[0], ignore=ratelimit.RateLimited)
+    if r.status_code != 200: return ""
+    try:
+        for entry in r.json():
+            for m in entry.get("meanings",[]):
+                for d in m.get("definitions",[]):
+                    txt = d.get("definition","")
+                    BAD = ("with a comp","used to","(used","an article","a function word",
+                           "expressing","indicates","denoting","refers to")
+                    if txt and not any(txt.lower().startswith(b) for b in BAD) and len(txt)>15:
+                        return txt[:240]
+    except Exception: pass
+    return ""
+
+def _dict_get(word):
+    """Called inside the breaker, so an open circuit spends no token; running out of tokens is not a failure."""
+    ratelimit.bucket("dict_api", DICT_API_RATE, state_dir=RATE_STATE_DIR)(RATE_WAIT)
+    r = http_client.client.get(DICT_API_URL + word, deadline=6)
+    if r.status_code == 429 or r.status_code >= 500: r.raise_for_status()
+    return r
+
+def _definition(en):
+    try: return _dict_api(en)
+    except Exception: return ""
+
+def breaker(name):
+    return resilience.breaker(name, BREAKER_FAILS, BREAKER_COOLDOWN)
+
+@metrics.timed("tier3", outcome=metrics.hit_or_miss)
+@resilience.single_flight("tier3").wrap(lookup_cache.normalize)
+@LCACHE.cached("tier3")
+def tier3_chain(word):
+    """None when there is no translation; raises when the translator fails, so that is not cached."""
+    en = _translate(word, "ta", "en")
+    if not en: return None
+    defn = _definition(en)
+    ta_defn = ""
+    if defn:
+        try: ta_defn = _translate(defn[:200], "en", "ta")
+        except Exception: pass
+    return _tier3_result(en, defn, ta_defn)
+
+def _translate(text, source, target):
+    """One translator call behind its circuit breaker; "" when Google has no translation."""
+    from deep_translator.exceptions import TranslationNotFound
+    def call():
+        ratelimit.bucket("translator", TRANSLATE_RATE, state_dir=RATE_STATE_DIR)(RATE_WAIT)
+        try: return _translator()(source=source, target=target).translate(text) or ""
+        except TranslationNotFound: return ""
+    return breaker("translator").call(call, ignore=ratelimit.RateLimited)
+
+def _translator():
+    """GoogleTranslator, with its HTTP calls going through the shared pooled client."""
+    import deep_translator.google
+    http_client.adopt(deep_translator.google, deadline=TRANSLATE_DEADLINE)
+    return deep_translator.google.GoogleTranslator
+
+def _tier3_result(en, defn, ta_defn):
+    return {"english":en,"tamil":ta_defn or "","definition":defn,"example":"","tier":3,"label":"🔗 மொழிபெயர்ப்பு"}
+
+def _pack(texts, limit=TRANSLATE_BATCH_BYTES):
+    """
+    Group texts into batches whose newline-joined, percent-encoded length stays under
+    `limit` bytes: a Tamil character takes 9, so counting characters overruns URL limits.
+    """
+    batch, size = [], 0
+    for t in texts:
+        n = len(quote(t)) + 3                 # + the encoded newline joining it to the next
+        if batch and size + n > limit:
+            yield batch
+            batch, size = [], 0
+        batch.append(t); size += n
+    if batch: yield batch
+
+def translate_many(texts, source, target):
+    """
+    Translate texts with one request per batch: the batch is sent as newline-separated
+    lines and the reply split back on newlines. A batch whose reply does not come back
+    with the same number of lines is retried one text at a time. Failures give "".
+    """
+    out = []
+    for batch in _pack([" ".join(t.split()) for t in texts]):
+        try:
+            parts = _translate("\n".join(batch), source, target).split("\n")
+        except Exception:
+            parts = []
+        if len(parts) != len(batch):
+            parts = []
+            for t in batch:
+                try: parts.append(_translate(t, source, target))
+                except Exception: parts.append("")
+        out.extend(p.strip() for p in parts)
+    return out
+
+@_once
+def _ml_pipe():
+    try:
+        return ml_backend.load_pipeline(ML_BACKEND, ONNX_DIR)
+    except Exception: return None
+
+@_once
+def _ml_batcher():
+    """One inference worker per process, shared by every session."""
+    pipe = _ml_pipe()
+    if not pipe: return None
+    return batching.MicroBatcher(lambda words: pipe(words, max_length=128, batch_size=len(words)),
+                                 max_batch=ML_BATCH, max_wait=ML_WAIT_MS / 1000)
+
+@metrics.timed("tier4", outcome=metrics.hit_or_miss)
+@resilience.single_flight("tier4").wrap(lookup_cache.normalize)
+@LCACHE.cached("tier4")
+def tier4_ml(word):
+    """None when the model is unavailable or gives nothing; raises when inference fails."""
+    batcher = _ml_batcher()
+    if not batcher: return None
+    res = breaker("ml").call(batcher, word, timeout=ML_TIMEOUT)
+    en = res.get("translation_text","") if res else ""
+    if not en: return None
+    return {"english":en,"tamil":"","definition":_definition(en),"example":"","tier":4,"label":"🤖 நரம்பு வலை"}
+
+@_once
+def _race_pool():
+    return ThreadPoolExecutor(8, thread_name_prefix="lookup-race")
+
+@_once
+def race_stats():
+    """Which tier answered raced lookups: {"tier3": n, "tier4": n, "timeout": n}."""
+    return Counter()
+
+def _race(word, budget):
+    """
+    Tier 3 starts at once and tier 4 joins after HEDGE_DELAY (or as soon as tier 3
+    comes back empty); the first non-empty answer within `budget` seconds wins. The
+    loser is cancelled if still queued, otherwise left to finish in the background,
+    where its result still fills the caches. Returns (result, settled): settled is
+    False when a tier failed or the budget ran out, i.e. a miss is not conclusive.
+    """
+    pool = _race_pool()
+    start   = time.monotonic()
+    end     = start + budget
+    pending = {pool.submit(tier3_chain, word): "tier3"}
+    hedged, settled = False, True
+    while True:
+        now = time.monotonic()
+        if not hedged and (not pending or now >= start + HEDGE_DELAY):
+            pending[pool.submit(tier4_ml, word)] = "tier4"
+            hedged = True
+        if not pending: return None, settled
+        if now >= end:
+            race_stats()["timeout"] += 1
+            break
+        timeout = end - now if hedged else min(end, start + HEDGE_DELAY) - now
+        done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+        for f in done:
+            tier = pending.pop(f)
+            settled = settled and not f.exception()
+            r = None if f.exception() else f.result()
+            if r:
+                race_stats()[tier] += 1
+                for g in pending: g.cancel()
+                return r, True
+    for g in pending: g.cancel()
+    return None, False
+
+def _in_turn(word):
+    """Tier 3 then tier 4 with no budget; same (result, settled) contract as _race."""
+    settled = True
+    for fn in (tier3_chain, tier4_ml):
+        try:
+            r = fn(word)
+            if r: return r, True
+        except Exception: settled = False
+    return None, settled
+
+@metrics.timed("lookup", outcome=lambda r: f"tier{r.get('tier', 0)}")
+def lookup(word, budget=None):
+    """
+    Dictionary tiers first; on a miss, tiers 3 and 4 are raced within `budget`
+    seconds (default LOOKUP_BUDGET; 0 tries them one after the other, unbounded).
+    Close headwords are offered alongside (see _with_near), not in place of them.
+    A conclusive miss is remembered for NEG_TTL seconds.
+    """
+    word = word.strip()
+    if not word: return {"english":"","tamil":"","tier":0,"label":""}
+    r = tier2_json(word)
+    if r: return r
+    near = tier2_fuzzy(word)
+    if NEG_TTL > 0 and LCACHE.get("miss", word, ttl=NEG_TTL): return _with_near(None, near)
+    budget = LOOKUP_BUDGET if budget is None else budget
+    r, settled = _race(word, budget) if budget > 0 else _in_turn(word)
+    if not r and settled and NEG_TTL > 0: LCACHE.put("miss", word, True)
+    return _with_near(r, near)
+
+def _with_near(r, near):
+    """
+    A network answer carries the close headwords as "match"/"suggestions"; only
+    when there is no answer (or the budget ran out) does the closest headword's
+    meaning stand in, since a correctly spelled word may be one letter off one.
+    """
+    if not r: return near or dict(NOT_FOUND)
+    if not near: return r
+    return {**r, "match":near["match"], "suggestions":near["suggestions"]}
+
+NOT_FOUND = {"english":"பொருள் கண்டுபிடிக்கவில்லை","tamil":"Meaning not found",
+             "definition":"","example":"","tier":0,"label":"கண்டுபிடிக்கவில்லை"}
+
+@metrics.timed("lookup_many")
+def lookup_many(words):
+    """
+    lookup() for many words at once. Local and cached answers are taken as-is; the
+    rest go through tier 3 with both translation legs batched (a few requests in
+    total rather than two per word), then tier 4 one by one for what is still missing.
+    Close headwords are attached as in lookup(). Returns {word: result}.
+    """
+    out, todo, near = {}, [], {}
+    order = list(dict.fromkeys(x.strip() for x in words if x.strip()))
+    for w in order:
+        r = tier2_json(w)
+        if r:
+            out[w] = r; continue
+        near[w] = tier2_fuzzy(w)
+        r = LCACHE.get("tier3", w) or LCACHE.get("tier4", w)
+        if r: out[w] = r
+        elif not (NEG_TTL > 0 and LCACHE.get("miss", w, ttl=NEG_TTL)): todo.append(w)
+
+    ens   = translate_many(todo, "ta", "en") if todo else []
+    found = [(w, en) for w, en in zip(todo, ens) if en]
+    defns = [_definition(en) for _, en in found]
+    ta_defns = translate_many([d[:200] for d in defns if d], "en", "ta")
+    ta_iter  = iter(ta_defns)
+    for (w, en), defn in zip(found, defns):
+        r = _tier3_result(en, defn, next(ta_iter) if defn else "")
+        LCACHE.put("tier3", w, r)
+        out[w] = r
+
+    for w in todo:
+        if w not in out:
+            try: r = tier4_ml(w)
+            except Exception: r = None
+            out[w] = r
+    return {w: out[w] if w not in near else _with_near(out.get(w), near[w]) for w in order}
+
+_races = race_stats()
+metrics.collect("tla_lookup_cache_events_total", "counter", "Persistent lookup cache hits and misses by tier.",
+                lambda: [({"tier":t, "event":ev}, n) for ev in ("hits", "misses")
+                         for t, n in sorted(LCACHE.stats()[ev].items())])
+metrics.collect("tla_lookup_cache_evictions_total", "counter", "Rows evicted from the persistent lookup cache.",
+                lambda: LCACHE.stats()["evictions"])
+metrics.collect("tla_lookup_cache_rows", "gauge", "Rows in the persistent lookup cache.",
+                lambda: LCACHE.stats()["rows"])
+metrics.collect("tla_race_wins_total", "counter", "Raced lookups by winning tier (or timeout).",
+                lambda: [({"winner":k}, v) for k, v in _races.items()])
+metrics.collect("tla_breaker_open", "gauge", "1 while a backend's circuit breaker is open or half-open.",
+                lambda: [({"backend":n}, int(b.state != "closed")) for n, b in resilience.breakers().items()])
+metrics.collect("tla_breaker_trips_total", "counter", "Times each circuit breaker has opened.",
+                lambda: [({"backend":n}, b.trips) for n, b in resilience.breakers().items()])
+metrics.collect("tla_singleflight_coalesced_total", "counter", "Lookups that waited on an identical in-flight call.",
+                lambda: [({"group":n}, f.coalesced) for n, f in resilience.flights().items()])
+metrics.collect("tla_ratelimit_rejected_total", "counter", "Calls that got no rate-limit token in time.",
+                lambda: [({"backend":n}, b.rejected) for n, b in ratelimit.buckets().items()])
+
+@metrics.timed("abstractive_summarize_ai")
+def abstractive_summarize_ai(text, length_hint="medium"):
+    """Call Anthropic API to generate a Tamil abstractive summary."""
+
+    length_map = {
+        "short":  "2–3 sentences",
+        "medium": "4–6 sentences",
+        "long":   "8–10 sentences",
+    }
+    length_desc = length_map.get(length_hint, "4–6 sentences")
+
+    prompt = (
+        f"நீங்கள் ஒரு தமிழ் மொழி நிபுணர். கீழே கொடுக்கப்பட்ட தமிழ் ஆவண உரையை "
+        f"படிக்கவும். இந்த உரையில் உள்ள அனைத்து முக்கிய கருத்துக்களையும், "
+        f"தகவல்களையும், நபர்களையும், நிபந்தனைகளையும் உள்ளடக்கிய "
+        f"விரிவான சுருக்கம் எழுதுங்கள். "
+        f"சுருக்கம் {length_desc} இருக்க வேண்டும். "
+        f"சுருக்கம் மட்டும் தமிழில் எழுதுங்கள், வேறு எந்த மொழியிலும் வேண்டாம். "
+        f"முன்னுரை அல்லது 'சுருக்கம்:' என்று தொடங்க வேண்டாம், நேரடியாக எழுதுங்கள்.\n\n"
+        f"உரை:\n{text[:4000]}\n\n"
+        f"சுருக்கம்:"
+    )
+
+    try:
+        resp = http_client.client.post(
+            AI_API_URL,
+            headers={"Content-Type": "application/json"},
+            json={
+                "model": "claude-sonnet-4-20250514",
+                "max_tokens": 1000,
+                "messages": [{"role": "user", "content": prompt}],
+            },
+            deadline=30,
+        )
+        data = resp.json()
+        text_out = ""
+        for block in data.get("content", []):
+            if block.get("type") == "text":
+                text_out += block["text"]
+        return text_out.strip() if text_out else None
+    except Exception as e:
+        return None
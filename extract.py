@@ -0,0 +1,345 @@
+"""
+Document text extraction: PDF, DOCX and plain text into a list of blocks
+{"type": "heading" | "list" | "para", "text": ...}. Used by the UI and the batch CLI.
+
+PDFs can also be read page by page (`iter_blocks`), so a caller can show the
+first pages while the rest are still being extracted, and limited to a page
+range and a maximum page count. Long PDFs (at least `min_pages` pages) can be
+split into page ranges extracted by a pool of `workers` processes, each opening
+the document itself; pages still come out in order.
+
+PDF blocks are rebuilt from PyMuPDF's line and span layout: wrapped lines are
+joined into paragraphs, lines set larger than the page's body text (or bold on
+their own) become headings, bulleted and numbered lines list items, and lines
+that recur in the top or bottom margin across pages (running headers, footers,
+page numbers) are dropped.
+
+With `use_ocr`, scanned pages (no usable text layer) are OCR'd (ocr.py) when
+OCR is available: on the same pool, a few pages ahead of the one being yielded,
+or inside the range workers for long PDFs.
+
+DOCX files are read straight from `word/document.xml` with an incremental XML
+parser, so memory does not grow with the document; paragraph styles (resolved
+through styles.xml) give headings and list items, and each table cell becomes
+a block of its own.
+
+Every extractor takes the document as bytes or as the path of a file on disk;
+from a path, PDFs and DOCX files are read in place and text files through a
+memory map, so a large upload need not be held in memory. `iter_blocks` can
+also stop after `max_chars` characters.
+"""
+import codecs, io, multiprocessing, os, re, tempfile, threading, zipfile
+import xml.etree.ElementTree as ET
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import ocr
+
+SUFFIXES = (".pdf", ".docx", ".txt")
+VERSION  = 4          # bump when extraction output changes, to invalidate cached blocks
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_DOCX_TEXT = {W + "tab": " ", W + "br": " ", W + "cr": " ", W + "noBreakHyphen": "-"}
+_DOCX_DONE = {W + "p", W + "tc", W + "tr", W + "tbl"}
+
+def _docx_styles(zf):
+    """styleId -> "heading" | "list" | None for the paragraph styles, following basedOn."""
+    try:
+        root = ET.fromstring(zf.read("word/styles.xml"))
+    except (KeyError, ET.ParseError):
+        return {}
+    own, parent = {}, {}
+    for st in root.iter(W + "style"):
+        if st.get(W + "type") != "paragraph":
+            continue
+        sid, name, ppr = st.get(W + "styleId"), st.find(W + "name"), st.find(W + "pPr")
+        name = (name.get(W + "val") or "").lower() if name is not None else ""
+        if "heading" in name or name == "title" or (ppr is not None and ppr.find(W + "outlineLvl") is not None):
+            own[sid] = "heading"
+        elif "list" in name or (ppr is not None and ppr.find(W + "numPr") is not None):
+            own[sid] = "list"
+        based = st.find(W + "basedOn")
+        if based is not None:
+            parent[sid] = based.get(W + "val")
+    def kind(sid, depth=0):
+        if sid in own or depth > 10 or sid not in parent:
+            return own.get(sid)
+        return kind(parent[sid], depth + 1)
+    return {sid: kind(sid) for sid in set(own) | set(parent)}
+
+def _docx_kind(p, styles):
+    ppr = p.find(W + "pPr")
+    if ppr is None:
+        return "para"
+    sty = ppr.find(W + "pStyle")
+    kind = styles.get(sty.get(W + "val")) if sty is not None else None
+    if ppr.find(W + "outlineLvl") is not None:
+        return "heading"
+    if not kind and ppr.find(W + "numPr") is not None:
+        return "list"
+    return kind or "para"
+
+def is_path(src):
+    return isinstance(src, (str, os.PathLike))
+
+def iter_docx(src):
+    """Yield the blocks of a DOCX file as its XML is parsed."""
+    with zipfile.ZipFile(src if is_path(src) else io.BytesIO(src)) as zf:
+        styles = _docx_styles(zf)
+        stack, cells = [], []                     # open elements; text of each open table cell, innermost last
+        for event, el in ET.iterparse(zf.open("word/document.xml"), events=("start", "end")):
+            if event == "start":
+                stack.append(el)
+                if el.tag == W + "tc": cells.append([])
+                continue
+            stack.pop()
+            if el.tag == W + "p":
+                text = " ".join("".join((e.text or "") if e.tag == W + "t" else _DOCX_TEXT.get(e.tag, "")
+                                        for e in el.iter()).split())
+                if cells:
+                    if text: cells[-1].append(text)
+                elif len(text) > 2:
+                    yield {"type":_docx_kind(el, styles),"text":text}
+            elif el.tag == W + "tc":
+                text = " ".join(cells.pop())
+                if len(text) > 2:
+                    yield {"type":"para","text":text}
+            if stack and (el.tag in _DOCX_DONE or stack[-1].tag == W + "body"):
+                # drop what has been read, so neither long bodies nor long tables accumulate;
+                # this also keeps text-box paragraphs from being read again by their outer paragraph
+                el.clear()
+                stack[-1].remove(el)
+
+def extract_docx(src):
+    return list(iter_docx(src))
+
+def page_span(n_pages, pages=None, max_pages=None):
+    """0-based indexes to read: `pages` is a 1-based inclusive (first, last), clipped to the document."""
+    first, last = pages or (1, n_pages)
+    first, last = max(1, first), min(n_pages, last or n_pages)
+    if max_pages:
+        last = min(last, first + max_pages - 1)
+    return range(first - 1, last)
+
+HEADING_SCALE = 1.15    # font size, relative to the page's body text, from which a line is a heading
+MARGIN        = 0.08    # top and bottom share of the page searched for running headers and footers
+LIST_RE = re.compile(r"\s*([•●▪◦‣∙*\-–]|\(?(\d{1,3}|[a-z]|[ivx]{1,4}|[\u0b85-\u0bb9])[.)])\s")
+
+def _lines(page):
+    """(bbox, text, font size, bold) of each non-empty text line, in content order."""
+    out = []
+    for b in page.get_text("dict")["blocks"]:
+        for l in b.get("lines", ()):
+            spans = [s for s in l["spans"] if s["text"].strip()]
+            if spans:
+                out.append((l["bbox"], " ".join("".join(s["text"] for s in l["spans"]).split()),
+                            max(s["size"] for s in spans),
+                            all(s["flags"] & 16 or "bold" in s["font"].lower() for s in spans)))
+    return out
+
+def _in_margin(page, bbox):
+    r = page.rect
+    return bbox[3] < r.y0 + MARGIN * r.height or bbox[1] > r.y1 - MARGIN * r.height
+
+def _signature(text):
+    return re.sub(r"\d+", "#", text.lower())
+
+def margin_signatures(doc, span, samples=8):
+    """Margin lines (digits ignored) found on at least half of up to `samples` pages spread over the span."""
+    idx = list(span)[::max(1, len(span) // samples)][:samples]
+    if len(idx) < 2:
+        return frozenset()
+    seen = Counter()
+    for i in idx:
+        page = doc[i]
+        seen.update({_signature(text) for bbox, text, _, _ in _lines(page) if _in_margin(page, bbox)})
+    return frozenset(sig for sig, n in seen.items() if n >= max(2, len(idx) / 2))
+
+def _join(a, b):
+    return a[:-1] + b if a.endswith("-") and a[-2:-1].isalpha() and b[:1].islower() else f"{a} {b}"
+
+def layout_blocks(page, skip=frozenset()):
+    """Blocks of a page with a text layer, leaving out margin lines whose signature is in `skip`."""
+    lines = [l for l in _lines(page) if not (skip and _in_margin(page, l[0]) and _signature(l[1]) in skip)]
+    if not lines:
+        return []
+    sizes, bold = Counter(), 0
+    for _, text, size, b in lines:
+        sizes[round(size, 1)] += len(text)
+        bold += len(text) if b else 0
+    body = sizes.most_common(1)[0][0]
+    bold_headings = bold < sum(sizes.values()) / 2        # not when the body itself is set in bold
+    blocks, prev = [], None
+    for bbox, text, size, b in lines:
+        if size >= body * HEADING_SCALE or (bold_headings and b and len(text) < 120 and size >= body * 0.95):
+            kind = "heading"
+        else:
+            kind = "list" if LIST_RE.match(text) else "para"
+        if prev:
+            pbox, psize, pkind, px0 = prev
+            close = -0.5 * size < bbox[1] - pbox[3] < 0.6 * size and abs(size - psize) < 0.5
+            indent = bbox[0] - px0 > 1.5 * size and blocks[-1]["text"][-1:] in ".!?:;"
+            if close and not indent and (kind == pkind != "list" or (kind == "para" and pkind == "list" and bbox[0] > px0)):
+                blocks[-1]["text"] = _join(blocks[-1]["text"], text)
+                prev = bbox, size, pkind, px0
+                continue
+        blocks.append({"type":kind,"text":text})
+        prev = bbox, size, kind, bbox[0]
+    return [b for b in blocks if len(b["text"]) > 2]
+
+def text_blocks(text):
+    """Paragraph blocks of plain page text (OCR output), paragraphs separated by blank lines."""
+    blocks = []
+    for para in re.split(r"\n\s*\n", text):
+        para = " ".join(para.split())
+        if len(para) > 2:
+            blocks.append({"type":"list" if LIST_RE.match(para) else "para","text":para})
+    return blocks
+
+def pdf_page_blocks(page, use_ocr=False, pool=None, skip=frozenset()):
+    """Blocks of one page; a scanned page is OCR'd, or with a pool becomes a Future of its OCR text."""
+    if use_ocr and ocr.needs_ocr(page):
+        return ocr.ocr_page(page, pool) if pool else text_blocks(ocr.ocr_page(page))
+    return layout_blocks(page, skip)
+
+def _resolve(job):
+    return text_blocks(job.result()) if isinstance(job, Future) else job
+
+def iter_pdf(src, pages=None, max_pages=None, workers=1, min_pages=64, use_ocr=False):
+    """Yield (pages done, pages to do, blocks of that page) one page at a time."""
+    import fitz
+    use_ocr = use_ocr and ocr.available()
+    doc = fitz.open(src, filetype="pdf") if is_path(src) else fitz.open(stream=src, filetype="pdf")
+    pending, done = deque(), 0
+    try:
+        span = page_span(doc.page_count, pages, max_pages)
+        skip = margin_signatures(doc, span)
+        if workers > 1 and len(span) >= min_pages:
+            doc.close()
+            yield from _iter_parallel(src, span, workers, use_ocr, skip)
+            return
+        pool = _pool(workers) if use_ocr and workers > 1 else None
+        for i in span:
+            pending.append(pdf_page_blocks(doc[i], use_ocr, pool, skip))
+            # keep up to two OCR jobs per worker in flight; text-layer pages pass straight through
+            while pending and (len(pending) > 2 * workers or not isinstance(pending[0], Future) or pending[0].done()):
+                done += 1
+                yield done, len(span), _resolve(pending.popleft())
+        while pending:
+            done += 1
+            yield done, len(span), _resolve(pending.popleft())
+    except BrokenProcessPool:
+        _drop_pool(workers)
+        raise
+    finally:
+        for job in pending:
+            if isinstance(job, Future): job.cancel()
+        if not doc.is_closed:
+            doc.close()                    # a path source (spilled upload) is otherwise held open until GC
+
+def extract_pdf(src, pages=None, max_pages=None, workers=1, min_pages=64, use_ocr=False):
+    return [b for _, _, page in iter_pdf(src, pages, max_pages, workers, min_pages, use_ocr) for b in page]
+
+
+def _extract_range(path, start, stop, use_ocr=False, skip=frozenset()):
+    import fitz
+    with fitz.open(path) as doc:
+        return [pdf_page_blocks(doc[i], use_ocr, skip=skip) for i in range(start, stop)]
+
+_pools, _pools_lock = {}, threading.Lock()
+
+def _pool(workers):
+    """A long-lived pool per size; spawned, not forked, since the caller may be a threaded server."""
+    with _pools_lock:
+        if workers not in _pools:
+            _pools[workers] = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        return _pools[workers]
+
+def _drop_pool(workers):
+    with _pools_lock:
+        _pools.pop(workers, None)
+
+def _iter_parallel(src, span, workers, use_ocr=False, skip=frozenset()):
+    if not is_path(src):                       # workers open the document themselves, so it needs a path
+        with tempfile.NamedTemporaryFile(suffix=".pdf") as tmp:
+            tmp.write(src)
+            tmp.flush()
+            yield from _iter_parallel(tmp.name, span, workers, use_ocr, skip)
+        return
+    step = max(8, -(-len(span) // (workers * 2)))
+    pool = _pool(workers)
+    futs = [pool.submit(_extract_range, src, i, min(i + step, span.stop), use_ocr, skip)
+            for i in range(span.start, span.stop, step)]
+    done = 0
+    try:
+        for fut in futs:
+            for blocks in fut.result():
+                done += 1
+                yield done, len(span), blocks
+    except BrokenProcessPool:
+        _drop_pool(workers)
+        raise
+    finally:
+        for fut in futs:
+            fut.cancel()
+
+TXT_SNIFF = 1 << 16          # bytes decoded up front to pick the encoding of a text file
+
+def _txt_encoding(head):
+    for enc in ("utf-8","utf-16"):
+        try:
+            codecs.getincrementaldecoder(enc)().decode(head, final=False)
+            return enc
+        except UnicodeError:
+            pass
+    return "latin-1"
+
+def iter_txt(src):
+    """Yield the lines of a text file as paragraphs, decoded as they are read."""
+    with open(src, "rb") if is_path(src) else io.BytesIO(src) as f:
+        enc = _txt_encoding(f.read(TXT_SNIFF))
+        f.seek(0)
+        for line in io.TextIOWrapper(f, enc, errors="replace"):
+            for l in line.splitlines():
+                if l.strip():
+                    yield {"type":"para","text":l.strip()}
+
+def extract_txt(src):
+    return list(iter_txt(src))
+
+
+def _cap(blocks, budget):
+    """The blocks that fit in `budget` characters (the last one cut short) and the budget left."""
+    out = []
+    for b in blocks:
+        if budget <= 0:
+            break
+        if len(b["text"]) > budget:
+            b = {**b, "text":b["text"][:budget]}
+        out.append(b)
+        budget -= len(b["text"])
+    return out, budget
+
+def iter_blocks(src, name, pages=None, max_pages=None, workers=1, min_pages=64, use_ocr=False, max_chars=None):
+    """Like iter_pdf for PDFs; other formats come back whole, as (1, 1, blocks). Stops after max_chars characters."""
+    budget = max_chars or float("inf")
+    name = name.lower()
+    if not name.endswith(".pdf"):
+        yield 1, 1, _cap((iter_docx if name.endswith(".docx") else iter_txt)(src), budget)[0]
+        return
+    pdf = iter_pdf(src, pages, max_pages, workers, min_pages, use_ocr)
+    try:
+        for done, total, blocks in pdf:
+            blocks, budget = _cap(blocks, budget)
+            yield done, total, blocks
+            if budget <= 0:
+                return
+    finally:
+        pdf.close()                            # cancels pages still queued on the pool
+
+def extract(src, name, pages=None, max_pages=None, use_ocr=False):
+    """Blocks of the document `src` (bytes or a path), dispatched on the extension of file name `name`."""
+    name = name.lower()
+    if name.endswith(".docx"): return extract_docx(src)
+    if name.endswith(".pdf"):  return extract_pdf(src, pages, max_pages, use_ocr=use_ocr)
+    return extract_txt(src)
@@ -0,0 +1,95 @@
+"""
+Misspelling-tolerant headword lookup (SymSpell-style deletion index).
+
+Edit distance is counted in Tamil letters (graphemes), so a wrong vowel sign
+(கா / கி) or a doubled consonant (க்க / க) is one edit. At build time every
+headword is stored under each of its variants with up to `max_dist` letters
+deleted; a query generates its own deletion variants and only the few words
+sharing one are compared with a real distance, so a lookup touches a handful
+of candidates regardless of dictionary size.
+
+The variant map stores headword ordinals and, like the reverse index, can be
+persisted as a tdict index file tagged with the dictionary's stamp, so later
+processes mmap it instead of rebuilding.
+"""
+import hashlib, struct
+from itertools import combinations
+import tdict
+from tdict import graphemes
+
+
+def _deletes(gs, max_dist):
+    """Strings formed by removing up to `max_dist` letters from `gs`."""
+    out = {"".join(gs)}
+    for d in range(1, min(max_dist, len(gs) - 1) + 1):
+        for drop in combinations(range(len(gs)), d):
+            out.add("".join(g for i, g in enumerate(gs) if i not in drop))
+    return out
+
+
+def distance(a, b):
+    """Optimal string alignment distance between two letter sequences."""
+    prev2, prev = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cur[j] = min(prev[j] + 1, cur[j-1] + 1, prev[j-1] + (a[i-1] != b[j-1]))
+            if i > 1 and j > 1 and a[i-1] == b[j-2] and a[i-2] == b[j-1]:
+                cur[j] = min(cur[j], prev2[j-2] + 1)
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+def build_deletes(words, max_dist=1, min_len=3):
+    """{deletion variant: [ordinal, ...]} for a sequence of headwords."""
+    out = {}
+    for i, w in enumerate(words):
+        gs = graphemes(w)
+        if len(gs) >= min_len:
+            for v in _deletes(gs, max_dist):
+                out.setdefault(v, []).append(i)
+    return out
+
+
+class FuzzyIndex:
+    def __init__(self, words=(), max_dist=1, min_len=3, deletes=None):
+        """`words` is a list or DictIndex of headwords; `deletes` their variant map, built here if not given."""
+        self.max_dist, self.min_len = max_dist, min_len
+        self._words = words if isinstance(words, (list, tdict.DictIndex)) else list(words)
+        self._del = build_deletes(self._words, max_dist, min_len) if deletes is None else deletes
+
+    def _word(self, i):
+        return self._words.key_at(i) if isinstance(self._words, tdict.DictIndex) else self._words[i]
+
+    def lookup(self, word, limit=5):
+        """Nearest headwords as [(word, distance)], closest first; exact matches excluded."""
+        gs = graphemes(word)
+        if len(gs) < self.min_len:
+            return []
+        seen, hits = {word}, []
+        for v in _deletes(gs, self.max_dist):
+            for cand in map(self._word, self._del.get(v, ())):
+                if cand in seen:
+                    continue
+                seen.add(cand)
+                cgs = graphemes(cand)
+                d = distance(gs, cgs)
+                if d <= self.max_dist:
+                    # Ties go to candidates with the same consonant skeleton (vowel-sign slips).
+                    hits.append((d, distance([g[0] for g in gs], [g[0] for g in cgs]), cand))
+        return [(w, d) for d, _, w in sorted(hits)[:limit]]
+
+
+def open_fuzzy(dindex, path=None, max_dist=1, min_len=3):
+    """FuzzyIndex over `dindex`, reusing (or writing) the persisted variant map at `path`."""
+    if path is None:
+        return FuzzyIndex(dindex, max_dist, min_len)
+    stamp = hashlib.blake2b(dindex.stamp + bytes([max_dist, min_len]), digest_size=8).digest()
+    try:
+        dels = tdict.DictIndex(path)
+        if dels.stamp == stamp:
+            return FuzzyIndex(dindex, max_dist, min_len, dels)
+    except (OSError, ValueError, struct.error):
+        pass
+    tdict.write_index(build_deletes(dindex, max_dist, min_len), path, stamp)
+    return FuzzyIndex(dindex, max_dist, min_len, tdict.DictIndex(path))
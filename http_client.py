@@ -0,0 +1,115 @@
+"""
+Shared outbound HTTP client for every network tier and the AI summarizer.
+
+One requests.Session per process keeps per-host keep-alive connection pools, so
+repeat calls skip DNS, TCP and TLS setup. Each call gets an overall deadline
+instead of a fixed timeout, idempotent calls are retried with jittered
+exponential backoff on connection errors and 429/5xx replies, and response
+bodies are capped in size.
+
+deep_translator calls requests.get() itself; `adopt(module)` points such a
+module at this client too.
+"""
+import random, threading, time
+import requests
+from requests.adapters import HTTPAdapter
+
+IDEMPOTENT = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class ResponseTooLarge(requests.RequestException):
+    pass
+
+
+class DeadlineExceeded(requests.Timeout):
+    pass
+
+
+class HttpClient:
+    def __init__(self, pool_size=16, max_bytes=2_000_000, retries=2, backoff=0.25, connect_timeout=3.0):
+        self.max_bytes, self.retries, self.backoff, self.connect_timeout = max_bytes, retries, backoff, connect_timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["User-Agent"] = "tamil-language-assistant"
+        self.calls = self.retried = 0
+        self._lock = threading.Lock()
+
+    def request(self, method, url, *, deadline=10.0, retry=None, max_bytes=None, **kw):
+        """
+        Send a request that must finish within `deadline` seconds overall. `retry`
+        defaults to True for idempotent methods. The body is read eagerly, at most
+        `max_bytes` of it; the returned Response behaves as usual (.json(), .text).
+        """
+        method = method.upper()
+        retry  = method in IDEMPOTENT if retry is None else retry
+        cap    = max_bytes or self.max_bytes
+        end, attempt = time.monotonic() + deadline, 0
+        with self._lock:
+            self.calls += 1
+        while True:
+            left = end - time.monotonic()
+            if left <= 0:
+                raise DeadlineExceeded(f"{method} {url}: deadline of {deadline}s exceeded")
+            try:
+                resp = self.session.request(method, url, stream=True,
+                                            timeout=(min(self.connect_timeout, left), left), **kw)
+                self._read(resp, cap, end)
+                if not (retry and resp.status_code in RETRY_STATUS and attempt < self.retries):
+                    return resp
+            except (requests.ConnectionError, requests.Timeout):
+                if not retry or attempt >= self.retries:
+                    raise
+            attempt += 1
+            with self._lock:
+                self.retried += 1
+            pause = self.backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+            time.sleep(max(0.0, min(pause, end - time.monotonic())))
+
+    @staticmethod
+    def _read(resp, cap, end):
+        declared = resp.headers.get("Content-Length")
+        if declared and declared.isdigit() and int(declared) > cap:
+            resp.close()
+            raise ResponseTooLarge(f"{resp.url}: {declared} bytes > {cap}")
+        body = bytearray()
+        for chunk in resp.iter_content(65536):
+            body += chunk
+            if len(body) > cap:
+                resp.close()
+                raise ResponseTooLarge(f"{resp.url}: body over {cap} bytes")
+            if time.monotonic() > end:
+                resp.close()
+                raise DeadlineExceeded(f"{resp.url}: deadline exceeded while reading body")
+        resp._content = bytes(body)
+
+    def get(self, url, **kw):
+        return self.request("GET", url, **kw)
+
+    def post(self, url, **kw):
+        return self.request("POST", url, **kw)
+
+
+client = HttpClient()
+
+
+class _RequestsShim:
+    """Stands in for the `requests` module inside libraries that call requests.get() directly."""
+
+    def __init__(self, client, deadline):
+        self._client, self._deadline = client, deadline
+
+    def get(self, url, params=None, **kw):
+        kw.pop("timeout", None)
+        return self._client.get(url, params=params, deadline=self._deadline, **kw)
+
+    def __getattr__(self, name):
+        return getattr(requests, name)
+
+
+def adopt(module, deadline=8.0):
+    """Route `module`'s requests.get() calls through the shared client (idempotent)."""
+    if not isinstance(getattr(module, "requests", None), _RequestsShim):
+        module.requests = _RequestsShim(client, deadline)
@@ -0,0 +1,123 @@
+"""
+Persistent lookup cache shared by every worker process on the host.
+
+Results of the network / model tiers are stored in one SQLite file (WAL mode, so
+readers never block the writer) keyed by (tier, normalized word), with a TTL and
+a row cap enforced by evicting the least recently used rows. Unlike
+st.cache_data it survives restarts and redeploys and is shared by replicas on
+the same host.
+"""
+import json, sqlite3, threading, time, unicodedata
+from collections import Counter
+from functools import wraps
+from pathlib import Path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    tier     TEXT NOT NULL,
+    key      TEXT NOT NULL,
+    value    TEXT NOT NULL,
+    created  REAL NOT NULL,
+    accessed REAL NOT NULL,
+    PRIMARY KEY (tier, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed);
+"""
+_MISS = object()
+
+
+def normalize(word):
+    return unicodedata.normalize("NFC", word).strip().lower()
+
+
+class LookupCache:
+    def __init__(self, path, ttl=7 * 86400, max_rows=100_000, touch_every=60):
+        self.path, self.ttl, self.max_rows, self.touch_every = Path(path), ttl, max_rows, touch_every
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._lock  = threading.Lock()
+        self._puts  = 0
+        self.hits, self.misses = Counter(), Counter()      # per tier: each tier is its own hit rate
+        self.evictions = 0
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self):
+        c = getattr(self._local, "conn", None)
+        if c is None:
+            c = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            c.execute("PRAGMA journal_mode=WAL")
+            c.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = c
+        return c
+
+    def _count(self, counter, tier):
+        with self._lock:
+            counter[tier] += 1
+
+    def get(self, tier, word, default=None, ttl=None):
+        """`ttl` overrides the cache-wide TTL, e.g. for short-lived negative entries."""
+        key, now = normalize(word), time.time()
+        try:
+            c = self._conn()
+            row = c.execute("SELECT value, created, accessed FROM cache WHERE tier=? AND key=?",
+                            (tier, key)).fetchone()
+            if row and now - row[1] <= (self.ttl if ttl is None else ttl):
+                if now - row[2] > self.touch_every:
+                    c.execute("UPDATE cache SET accessed=? WHERE tier=? AND key=?", (now, tier, key))
+                self._count(self.hits, tier)
+                return json.loads(row[0])
+        except sqlite3.Error:
+            pass
+        self._count(self.misses, tier)
+        return default
+
+    def put(self, tier, word, value):
+        now = time.time()
+        try:
+            self._conn().execute("INSERT OR REPLACE INTO cache VALUES (?,?,?,?,?)",
+                                 (tier, normalize(word), json.dumps(value, ensure_ascii=False), now, now))
+        except sqlite3.Error:
+            return
+        with self._lock:
+            self._puts += 1
+            sweep = self._puts % 64 == 1
+        if sweep:
+            self.evict()
+
+    def evict(self):
+        """Drop expired rows, then the least recently used ones above `max_rows`."""
+        try:
+            c = self._conn()
+            n = c.execute("DELETE FROM cache WHERE created < ?", (time.time() - self.ttl,)).rowcount
+            over = c.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_rows
+            if over > 0:
+                n += c.execute("DELETE FROM cache WHERE (tier, key) IN "
+                               "(SELECT tier, key FROM cache ORDER BY accessed LIMIT ?)", (over,)).rowcount
+        except sqlite3.Error:
+            return
+        with self._lock:
+            self.evictions += max(n, 0)
+
+    def stats(self):
+        try:
+            rows = self._conn().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        except sqlite3.Error:
+            rows = 0
+        with self._lock:
+            hits, misses = dict(self.hits), dict(self.misses)
+        return {"hits":hits, "misses":misses, "evictions":self.evictions, "rows":rows}
+
+    def cached(self, tier):
+        """Decorator caching fn(word) under `tier`; empty results are not stored."""
+        def deco(fn):
+            @wraps(fn)
+            def wrapper(word, *a, **kw):
+                r = self.get(tier, word, _MISS)
+                if r is not _MISS:
+                    return r
+                r = fn(word, *a, **kw)
+                if r:
+                    self.put(tier, word, r)
+                return r
+            return wrapper
+        return deco
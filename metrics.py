@@ -0,0 +1,149 @@
+"""
+Process-wide latency histograms and counters in Prometheus text format.
+
+    @metrics.timed("tier3", outcome=metrics.hit_or_miss)
+    def tier3_chain(word): ...
+
+records every call in `tla_op_duration_seconds{op, outcome}` (a histogram, so
+its _count is the call counter); exceptions are recorded as outcome="error".
+Values owned by other components (cache hits, breaker states) are read when the
+metrics are rendered, through `collect()`.
+
+`start()` exposes them on http://host:port/metrics and/or rewrites a .prom file
+every few seconds (for node_exporter's textfile collector; "{pid}" in the file
+name gives each worker process its own file).
+"""
+import os, threading, time
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+BUCKETS = (.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30)
+OP_SECONDS = "tla_op_duration_seconds"
+
+_lock = threading.Lock()
+_hists = {}        # (name, labels) -> [bucket counts..., +Inf count, sum]
+_counters = {}     # (name, labels) -> value
+_help = {OP_SECONDS: ("histogram", "Latency of instrumented operations by outcome.")}
+_collectors = {}   # name -> (type, help, fn)
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+def inc(name, value=1, help="", **labels):
+    with _lock:
+        _help.setdefault(name, ("counter", help))
+        k = _key(name, labels)
+        _counters[k] = _counters.get(k, 0) + value
+
+def observe(name, value, help="", **labels):
+    with _lock:
+        _help.setdefault(name, ("histogram", help))
+        h = _hists.setdefault(_key(name, labels), [0] * (len(BUCKETS) + 2))
+        i = next((i for i, b in enumerate(BUCKETS) if value <= b), len(BUCKETS))
+        h[i] += 1
+        h[-1] += value
+
+def collect(name, kind, help, fn):
+    """Register fn() -> number or [(labels dict, value)], evaluated at render time."""
+    with _lock:
+        _collectors[name] = (kind, help, fn)
+
+
+def hit_or_miss(r):
+    return "hit" if r else "miss"
+
+def timed(op, outcome=None):
+    """Decorator timing each call into OP_SECONDS{op, outcome}; outcome(result) defaults to ok/empty."""
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(*a, **kw):
+            t = time.perf_counter()
+            try:
+                r = fn(*a, **kw)
+            except Exception:
+                observe(OP_SECONDS, time.perf_counter() - t, op=op, outcome="error")
+                raise
+            label = outcome(r) if outcome else ("ok" if r else "empty")
+            observe(OP_SECONDS, time.perf_counter() - t, op=op, outcome=label)
+            return r
+        return wrapper
+    return deco
+
+
+def _labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items: return ""
+    esc = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in items) + "}"
+
+def render():
+    with _lock:
+        hists, counters = {k: list(v) for k, v in _hists.items()}, dict(_counters)
+        meta, collectors = dict(_help), dict(_collectors)
+    out = []
+    for name in sorted({n for n, _ in hists} | {n for n, _ in counters}):
+        kind, help = meta.get(name, ("untyped", ""))
+        out += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+        for (n, labels), v in sorted(counters.items()):
+            if n == name: out.append(f"{name}{_labels(labels)} {v}")
+        for (n, labels), h in sorted(hists.items()):
+            if n != name: continue
+            cum = 0
+            for b, c in zip(BUCKETS + ("+Inf",), h[:-1]):
+                cum += c
+                out.append(f"{name}_bucket{_labels(labels, [('le', b)])} {cum}")
+            out += [f"{name}_sum{_labels(labels)} {h[-1]:.6f}", f"{name}_count{_labels(labels)} {cum}"]
+    for name, (kind, help, fn) in sorted(collectors.items()):
+        try:
+            v = fn()
+        except Exception:
+            continue
+        out += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+        rows = [({}, v)] if isinstance(v, (int, float)) else v
+        out += [f"{name}{_labels(sorted(lbl.items()))} {val}" for lbl, val in rows]
+    return "\n".join(out) + "\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404); return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *a):
+        pass
+
+def _write_loop(path, every):
+    path = Path(str(path).format(pid=os.getpid()))
+    while True:
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            tmp.write_text(render(), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError:
+            pass
+        time.sleep(every)
+
+_started = False
+
+def start(port=0, path=None, every=15.0):
+    """Start the exporters once per process: an HTTP /metrics endpoint and/or a periodically written file."""
+    global _started
+    with _lock:
+        if _started: return
+        _started = True
+    if port:
+        try:
+            srv = ThreadingHTTPServer(("0.0.0.0", port), _Handler)
+            threading.Thread(target=srv.serve_forever, name="metrics-http", daemon=True).start()
+        except OSError:
+            pass          # another worker on this host already serves the port
+    if path:
+        threading.Thread(target=_write_loop, args=(path, every), name="metrics-file", daemon=True).start()
@@ -0,0 +1,90 @@
+"""
+Backends for the tier 4 translation model (Helsinki-NLP/opus-mt-ta-en).
+
+    torch  the transformers pipeline over the full-precision PyTorch model (default)
+    onnx   the same model exported once to ONNX with int8 dynamic quantization and
+           run by ONNX Runtime; needs `pip install optimum[onnxruntime]`
+
+Both return a transformers translation pipeline, so callers see identical output
+structure. Check that the two agree with:
+
+    python ml_backend.py --parity [word ...]
+"""
+import os, shutil, time
+from pathlib import Path
+
+MODEL = "Helsinki-NLP/opus-mt-ta-en"
+
+
+def load_pipeline(backend="torch", onnx_dir=None):
+    from transformers import pipeline
+    if backend != "onnx":
+        return pipeline("translation", model=MODEL, device=-1)
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    from transformers import AutoTokenizer
+    onnx_dir = Path(onnx_dir)
+    if not (onnx_dir / "config.json").exists():
+        export_onnx(onnx_dir)
+    have = {p.name for p in onnx_dir.glob("*_quantized.onnx")}
+    files = {k: f for k, f in (("encoder_file_name", "encoder_model_quantized.onnx"),
+                               ("decoder_file_name", "decoder_model_quantized.onnx"),
+                               ("decoder_with_past_file_name", "decoder_with_past_model_quantized.onnx"))
+             if f in have}
+    model = ORTModelForSeq2SeqLM.from_pretrained(onnx_dir, **files)
+    return pipeline("translation", model=model, tokenizer=AutoTokenizer.from_pretrained(onnx_dir), device=-1)
+
+
+def export_onnx(out_dir):
+    """Export MODEL to ONNX and quantize every graph to int8 (dynamic), written atomically to `out_dir`."""
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+    out_dir = Path(out_dir)
+    tmp  = out_dir.with_name(f"{out_dir.name}.{os.getpid()}.tmp")
+    fp32 = tmp / "fp32"
+    model = ORTModelForSeq2SeqLM.from_pretrained(MODEL, export=True)
+    model.save_pretrained(fp32)
+    AutoTokenizer.from_pretrained(MODEL).save_pretrained(tmp)
+    qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+    for f in sorted(fp32.glob("*.onnx")):
+        ORTQuantizer.from_pretrained(fp32, file_name=f.name).quantize(save_dir=tmp, quantization_config=qconfig)
+    for f in fp32.glob("*.json"):
+        shutil.copy(f, tmp / f.name)
+    shutil.rmtree(fp32)
+    try:
+        os.replace(tmp, out_dir)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)   # another process finished first
+    return out_dir
+
+
+def parity(words, onnx_dir):
+    """Translate `words` with both backends; returns (rows, agreement %, seconds per backend)."""
+    outs, secs = {}, {}
+    for backend in ("torch", "onnx"):
+        pipe = load_pipeline(backend, onnx_dir)
+        t = time.perf_counter()
+        outs[backend] = [r["translation_text"] for r in pipe(list(words), max_length=128, batch_size=16)]
+        secs[backend] = time.perf_counter() - t
+    rows  = list(zip(words, outs["torch"], outs["onnx"]))
+    agree = round(100 * sum(a.strip().lower() == b.strip().lower() for _, a, b in rows) / max(1, len(rows)), 1)
+    return rows, agree, secs
+
+
+if __name__ == "__main__":
+    import argparse, itertools
+    import tdict
+    here = Path(__file__).parent
+    ap = argparse.ArgumentParser(description="Export or parity-check the ONNX tier 4 backend.")
+    ap.add_argument("--onnx-dir", default=str(here / ".cache" / "opus-mt-ta-en-int8"))
+    ap.add_argument("--parity", action="store_true", help="compare torch and onnx translations")
+    ap.add_argument("words", nargs="*")
+    args = ap.parse_args()
+    if not args.parity:
+        print(export_onnx(args.onnx_dir))
+    else:
+        words = args.words or [w for w, _ in itertools.islice(tdict.read_source(here / "Tamil.json"), 50)]
+        rows, agree, secs = parity(words, args.onnx_dir)
+        for w, a, b in rows:
+            print(f"{'=' if a.strip().lower() == b.strip().lower() else '≠'} {w}\t{a}\t{b}")
+        print(f"agreement {agree}% · torch {secs['torch']:.2f}s · onnx {secs['onnx']:.2f}s")
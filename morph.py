@@ -0,0 +1,113 @@
+"""
+Table-driven Tamil suffix stripper for the local dictionary tier.
+
+Suffixes are written in their surface (joined) form and compiled into a reverse
+trie, so every suffix of a word is found in one right-to-left walk. A suffix that
+starts with a vowel sign (ை, ில், ுக்கு ...) fuses with the stem's last consonant;
+a consonant-initial one (கள், க்கு, கிறான் ...) follows it. Junction (sandhi)
+rules then rebuild the possible dictionary forms of what is left:
+
+    மரத்தை   -> மரத்த + ை    -> மரம்      (-அம் oblique -த்த-)
+    வீட்டில்  -> வீட்ட + ில்   -> வீடு      (doubled ட்ட / ற்ற)
+    கடமையை  -> கடமைய + ை   -> கடமை     (ய / வ glide)
+    மரங்கள்  -> மரங் + கள்    -> மரம்      (ம் -> ங் before க)
+    அன்பும்   -> அன்ப + ும்    -> அன்பு     (elided உ)
+
+Suffixes sit in slots (plural < case / verb ending < clitic) and are stripped
+right to left in decreasing slot order, so மரங்களிலும் peels ும், then ில், then கள்.
+"""
+from functools import lru_cache
+
+PLURAL, CASE, CLITIC = 1, 2, 3
+
+# (surface form, slot, extra endings to try on the stem)
+_CASE = ["ை", "ில்", "ிலே", "ிலிருந்து", "ின்", "ினால்", "ினுடைய", "ுடைய", "ிடம்", "ிடமிருந்து",
+         "ுக்கு", "க்கு", "ுக்காக", "க்காக", "ால்", "ோடு", "ொடு", "ுடன்", "உடன்", "ிற்கு", "ுக்கான",
+         "க்கான", "ில்லாத", "ாக", "ான"]
+_CLITIC = ["ும்", "ே", "ா", "ோ", "தான்"]
+_PLURAL = ["கள்"]
+
+_TENSE = ["கிற", "க்கிற", "கின்ற", "க்கின்ற", "த்த", "ந்த", "ட", "ற", "ின", "ப்ப", "வ", "த"]
+_PNG   = ["ான்", "ாள்", "ார்", "ார்கள்", "ேன்", "ோம்", "ாய்", "ீர்", "ீர்கள்", "து", "ன"]
+_VERB  = sorted({t + p for t in _TENSE for p in _PNG} | {"க்கும்", "க்க", "ந்து", "த்து", "ப்பது", "வது"})
+
+SUFFIXES = ([(s, PLURAL, ()) for s in _PLURAL] +
+            [(s, CASE, ()) for s in _CASE] +
+            [(s, CASE, ("தல்",)) for s in _VERB] +
+            [(s, CLITIC, ()) for s in _CLITIC])
+
+_SIGNS  = set("ாிீுூெேைொோௌ")
+_PULLI  = "்"
+_HARD   = ("க்", "ச்", "த்", "ப்")
+_MIN_STEM = 2
+
+
+def _compile(table):
+    """Reverse trie: dict of char -> subtrie, with "" -> [(suffix, slot, extras)] at ends."""
+    root = {}
+    for suf, slot, extra in table:
+        node = root
+        for ch in reversed(suf):
+            node = node.setdefault(ch, {})
+        node.setdefault("", []).append((suf, slot, extra))
+    return root
+
+_RTRIE = _compile(SUFFIXES)
+
+
+def _match(word):
+    """All suffixes of `word` in the table, longest first."""
+    out, node = [], _RTRIE
+    for i in range(len(word) - 1, 0, -1):
+        node = node.get(word[i])
+        if node is None:
+            break
+        out.extend(node.get("", ()))
+    return out[::-1]
+
+
+def _repair(rem, vowel_initial):
+    """Candidate dictionary forms for the part of the word left of a suffix."""
+    out = []
+    if vowel_initial:
+        if rem.endswith("த்த"):                  out.append(rem[:-3] + "ம்")
+        if rem.endswith(("ய", "வ")):             out.append(rem[:-1])
+        if rem.endswith(("ட்ட", "ற்ற")):          out.append(rem[:-2] + "ு")
+        out += [rem + "ு", rem + _PULLI, rem]
+    else:
+        if rem.endswith("த்து"):                 out.append(rem[:-4] + "ம்")
+        if rem.endswith("ங்"):                   out.append(rem[:-2] + "ம்")
+        if rem.endswith(("ட்டு", "ற்று")):        out.append(rem[:-3] + "ு")
+        if rem.endswith(_HARD):                  out.append(rem[:-2])
+        if rem.endswith("ு"):                    out.append(rem[:-1] + _PULLI)
+        out.append(rem)
+    return out
+
+
+@lru_cache(maxsize=4096)
+def stems(word, max_slot=CLITIC):
+    """
+    Candidate stems of an inflected `word`, best first: longer suffixes and more
+    specific junction rules rank higher, and single-suffix analyses come before
+    stacked ones. The word itself is never included.
+    """
+    ranked, deeper = [], []
+    for suf, slot, extra in _match(word):
+        if slot > max_slot:
+            continue
+        rem = word[:-len(suf)]
+        if len(rem) < _MIN_STEM:
+            continue
+        for cand in _repair(rem, suf[0] in _SIGNS):
+            if len(cand) < _MIN_STEM or cand.endswith(_PULLI + _PULLI):
+                continue
+            ranked.append(cand)
+            ranked.extend(cand + e for e in extra)
+            if slot > PLURAL:
+                deeper.extend(stems(cand, slot - 1))
+    seen, out = {word}, []
+    for c in ranked + deeper:
+        if c not in seen:
+            seen.add(c)
+            out.append(c)
+    return tuple(out)
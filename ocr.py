@@ -0,0 +1,100 @@
+"""
+OCR for PDF pages without a usable text layer (scanned government orders).
+
+Only pages that carry images and too little extractable text are OCR'd, so a
+mixed PDF pays for the scanned pages alone. A page is rendered to grayscale at
+DPI, deskewed and binarized with OpenCV, and read by Tesseract (LANG, default
+"tam+eng"). Results are cached on disk by a hash of the rendered page, so the
+same scan is never recognized twice on a host.
+
+Needs the tesseract binary with the Tamil traineddata (packages.txt), pytesseract
+and opencv; without them `available()` is False and pages keep their text layer.
+"""
+import os, hashlib
+from concurrent.futures import Future
+from functools import lru_cache
+from pathlib import Path
+import doc_cache
+
+DPI       = int(os.environ.get("TLA_OCR_DPI", 300))          # ~300 dpi suits 10-12 pt Tamil print
+MAX_SIDE  = int(os.environ.get("TLA_OCR_MAX_SIDE", 5000))    # pixels; large-format pages render at less
+LANG      = os.environ.get("TLA_OCR_LANG", "tam+eng")
+MIN_CHARS = int(os.environ.get("TLA_OCR_MIN_CHARS", 20))      # letters below which a text layer is unusable
+CACHE_DIR = Path(os.environ.get("TLA_OCR_CACHE", Path(__file__).parent / ".cache" / "ocr"))
+VERSION   = 1          # bump when preprocessing changes
+
+
+@lru_cache(maxsize=None)
+def available():
+    try:
+        import cv2, numpy, pytesseract
+        langs = set(pytesseract.get_languages(config=""))
+    except Exception:
+        return False
+    return all(l in langs for l in LANG.split("+"))
+
+@lru_cache(maxsize=None)
+def cache():
+    return doc_cache.DocCache(CACHE_DIR, int(os.environ.get("TLA_OCR_CACHE_MB", 256)) << 20)
+
+
+def _letters(text):
+    return sum(1 for c in text if c.isalnum() or "\u0b80" <= c <= "\u0bff")
+
+def needs_ocr(page, text=None):
+    """True for a page that holds images but (almost) no extractable text."""
+    if not page.get_images(full=False):
+        return False
+    return _letters(page.get_text() if text is None else text) < MIN_CHARS
+
+def render(page):
+    """(width, height, gray bytes) of the page at DPI, scaled down so neither side exceeds MAX_SIDE."""
+    import fitz
+    dpi = min(DPI, int(MAX_SIDE * 72 / max(page.rect.width, page.rect.height, 1)))
+    pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+    return pix.width, pix.height, pix.samples
+
+def preprocess(gray):
+    """Deskew by the minimum-area rectangle around the ink, then binarize."""
+    import cv2
+    ink = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)[1]
+    pts = cv2.findNonZero(ink)
+    if pts is not None:
+        angle = cv2.minAreaRect(pts)[-1]          # (0, 90] in OpenCV >= 4.5
+        if angle > 45:
+            angle -= 90
+        if 0.2 < abs(angle) < 15:
+            rows, cols = gray.shape
+            m = cv2.getRotationMatrix2D((cols / 2, rows / 2), angle, 1.0)
+            gray = cv2.warpAffine(gray, m, (cols, rows), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
+    gray = cv2.medianBlur(gray, 3)
+    return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 15)
+
+def recognize(width, height, samples, lang=LANG):
+    """Text of a rendered grayscale page. Runs in pool workers, so Tesseract is kept to one thread."""
+    import numpy as np, pytesseract
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    gray = np.frombuffer(samples, np.uint8).reshape(height, width)
+    return pytesseract.image_to_string(preprocess(gray), lang=lang, config="--oem 1 --psm 3")
+
+
+def ocr_page(page, pool=None):
+    """
+    OCR text of `page`, from the cache or recognized here; with a process pool,
+    a Future of it instead (already resolved on a cache hit).
+    """
+    img = render(page)
+    key = cache().key(hashlib.sha256(img[2]).hexdigest(), img[:2], LANG, VERSION)
+    text = cache().get(key)
+    if pool is None:
+        if text is None:
+            text = recognize(*img)
+            cache().put(key, text)
+        return text
+    if text is not None:
+        fut = Future()
+        fut.set_result(text)
+        return fut
+    fut = pool.submit(recognize, *img)
+    fut.add_done_callback(lambda f: f.cancelled() or f.exception() or cache().put(key, f.result()))
+    return fut
@@ -0,0 +1,69 @@
+"""
+Background prefetch of word meanings for an uploaded document.
+
+A Prefetcher resolves a document's words on a small thread pool, most frequent
+first and `batch` words per call, so the results land in the lookup caches
+before the reader clicks them. Calls are spaced by one process-wide throttle so
+several open documents together stay under the upstream rate.
+"""
+import threading, time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+
+class _Throttle:
+    """Spaces calls at least 1/per_sec seconds apart across all threads."""
+
+    def __init__(self, per_sec):
+        self.gap, self._next, self._lock = 1.0 / per_sec, 0.0, threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.gap
+        if delay > 0:
+            time.sleep(delay)
+
+
+_throttles = {}
+_throttles_lock = threading.Lock()
+
+def throttle(per_sec):
+    with _throttles_lock:
+        return _throttles.setdefault(per_sec, _Throttle(per_sec))
+
+
+class Prefetcher:
+    def __init__(self, words, resolve, batch=1, workers=4, per_sec=4.0, initializer=None):
+        """`words` is a list or a Counter of word counts; `resolve` takes a list of up to `batch` words."""
+        order = [w for w, _ in Counter(words).most_common()]
+        self.total, self.done, self.failed = len(order), 0, 0
+        self._resolve, self._throttle = resolve, throttle(per_sec)
+        self._lock, self._stop = threading.Lock(), threading.Event()
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="prefetch", initializer=initializer)
+        for i in range(0, len(order), batch):
+            self._pool.submit(self._run, order[i:i + batch])
+        self._pool.shutdown(wait=False)
+
+    def _run(self, words):
+        if self._stop.is_set():
+            return
+        self._throttle.wait()
+        ok = False
+        try:
+            self._resolve(words)
+            ok = True
+        except Exception:
+            pass
+        with self._lock:
+            self.done += len(words)
+            self.failed += 0 if ok else len(words)
+
+    @property
+    def finished(self):
+        return self.done >= self.total or self._stop.is_set()
+
+    def cancel(self):
+        self._stop.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
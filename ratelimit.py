@@ -0,0 +1,123 @@
+"""
+Token-bucket rate limiting for the upstream translator and dictionary API.
+
+Each backend has one bucket per process, or per host when given a state file:
+the bucket level then lives in that file and every process updates it under an
+exclusive flock, so all workers together stay under the upstream quota.
+
+Waiting callers queue by priority, then arrival order. The priority comes from a
+context variable, so code deep in the call stack does not need to pass it along;
+background work (document prefetch) runs under `background()` or sets
+`priority` to BACKGROUND in its worker threads, and interactive lookups go first.
+"""
+import contextvars, heapq, itertools, threading, time
+from contextlib import contextmanager
+from pathlib import Path
+
+INTERACTIVE, BACKGROUND = 0, 1
+priority = contextvars.ContextVar("ratelimit_priority", default=INTERACTIVE)
+
+
+class RateLimited(Exception):
+    pass
+
+
+@contextmanager
+def background():
+    token = priority.set(BACKGROUND)
+    try:
+        yield
+    finally:
+        priority.reset(token)
+
+
+class TokenBucket:
+    def __init__(self, rate, burst=None, state_path=None):
+        """`rate` tokens per second, at most `burst` stored; `state_path` makes the bucket host-wide."""
+        self.rate, self.burst = rate, burst or max(1.0, rate)
+        self.state_path = Path(state_path) if state_path else None
+        self._tokens, self._stamp = self.burst, time.time()
+        self._cond, self._waiters, self._seq = threading.Condition(), [], itertools.count()
+        self.granted = self.rejected = 0
+
+    def _refill(self, tokens, stamp, now):
+        return min(self.burst, tokens + (now - stamp) * self.rate)
+
+    def _take(self):
+        """Take one token if available; returns 0, or the seconds until one will be."""
+        if self.state_path:
+            return self._take_shared()
+        now = time.time()
+        self._tokens, self._stamp = self._refill(self._tokens, self._stamp, now), now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0
+        return (1 - self._tokens) / self.rate
+
+    def _take_shared(self):
+        import fcntl
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.state_path, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    tokens, stamp = map(float, f.read().split())
+                except ValueError:
+                    tokens, stamp = self.burst, time.time()
+                now = time.time()
+                tokens = self._refill(tokens, stamp, now)
+                wait = 0 if tokens >= 1 else (1 - tokens) / self.rate
+                if not wait:
+                    tokens -= 1
+                f.seek(0)
+                f.truncate()
+                f.write(f"{tokens} {now}")
+                f.flush()
+                return wait
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def acquire(self, timeout=None):
+        """Wait for a token, behind every waiter of higher priority; False on timeout."""
+        end = None if timeout is None else time.monotonic() + timeout
+        me = (priority.get(), next(self._seq))
+        with self._cond:
+            heapq.heappush(self._waiters, me)
+            try:
+                while True:
+                    wait = self._take() if self._waiters[0] == me else None
+                    if wait == 0:
+                        self.granted += 1
+                        return True
+                    if end is not None:
+                        left = end - time.monotonic()
+                        if left <= 0:
+                            self.rejected += 1
+                            return False
+                        wait = left if wait is None else min(wait, left)
+                    self._cond.wait(wait)
+            finally:
+                self._waiters.remove(me)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+    def __call__(self, timeout=None):
+        if not self.acquire(timeout):
+            raise RateLimited(f"no token within {timeout}s")
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+def bucket(name, rate, burst=None, state_dir=None):
+    """The process-wide bucket for backend `name`; host-wide when `state_dir` is set."""
+    with _buckets_lock:
+        if name not in _buckets:
+            path = Path(state_dir) / f"{name}.bucket" if state_dir else None
+            _buckets[name] = TokenBucket(rate, burst, path)
+        return _buckets[name]
+
+def buckets():
+    with _buckets_lock:
+        return dict(_buckets)
@@ -0,0 +1,137 @@
+"""
+Failure isolation for the network and model backends.
+
+A CircuitBreaker per backend counts consecutive failures. After `threshold` of
+them it opens and calls fail fast with CircuitOpen instead of waiting out a
+timeout. Once `cooldown` seconds have passed it lets a single probe call through
+(half-open); success closes it again, failure re-opens it for another cooldown.
+
+A SingleFlight lets only one call per key run at a time: concurrent callers for
+the same key wait for that call and share its result (or exception).
+"""
+import threading, time
+from concurrent.futures import Future
+from functools import wraps
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(self, name, threshold=5, cooldown=30.0):
+        self.name, self.threshold, self.cooldown = name, threshold, cooldown
+        self.failures, self.trips = 0, 0
+        self._opened, self._probing = None, False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened is None:
+                return "closed"
+            return "half-open" if self._probing or time.monotonic() - self._opened >= self.cooldown else "open"
+
+    def allow(self):
+        with self._lock:
+            if self._opened is None:
+                return True
+            if self._probing or time.monotonic() - self._opened < self.cooldown:
+                return False
+            self._probing = True
+            return True
+
+    def record(self, ok):
+        with self._lock:
+            if ok:
+                self.failures, self._opened, self._probing = 0, None, False
+                return
+            self.failures += 1
+            if self._probing or (self._opened is None and self.failures >= self.threshold):
+                self.trips += self._opened is None
+                self._opened, self._probing = time.monotonic(), False
+
+    def release(self):
+        """Give back an allow() whose call never reached the backend, without an outcome."""
+        with self._lock:
+            self._probing = False
+
+    def call(self, fn, *a, ignore=(), **kw):
+        """fn(*a, **kw) if the circuit allows it; exceptions of the `ignore` types count neither way."""
+        if not self.allow():
+            raise CircuitOpen(self.name)
+        try:
+            r = fn(*a, **kw)
+        except ignore:
+            self.release()
+            raise
+        except Exception:
+            self.record(False)
+            raise
+        self.record(True)
+        return r
+
+
+_breakers = {}
+_registry_lock = threading.Lock()
+
+def breaker(name, threshold=5, cooldown=30.0):
+    """The process-wide breaker for backend `name` (created on first use)."""
+    with _registry_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name, threshold, cooldown)
+        return _breakers[name]
+
+def breakers():
+    with _registry_lock:
+        return dict(_breakers)
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls, self._lock = {}, threading.Lock()
+        self.leaders = self.coalesced = 0
+
+    def do(self, key, fn, *a, **kw):
+        with self._lock:
+            fut = self._calls.get(key)
+            leader = fut is None
+            if leader:
+                fut = self._calls[key] = Future()
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            return fut.result()
+        try:
+            r = fn(*a, **kw)
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        else:
+            fut.set_result(r)
+            return r
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def wrap(self, key=lambda x: x):
+        """Decorator de-duplicating concurrent fn(arg, ...) calls by key(arg)."""
+        def deco(fn):
+            @wraps(fn)
+            def wrapper(arg, *a, **kw):
+                return self.do(key(arg), fn, arg, *a, **kw)
+            return wrapper
+        return deco
+
+
+_flights = {}
+
+def single_flight(name):
+    """The process-wide SingleFlight group `name` (created on first use)."""
+    with _registry_lock:
+        return _flights.setdefault(name, SingleFlight())
+
+def flights():
+    with _registry_lock:
+        return dict(_flights)
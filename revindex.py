@@ -0,0 +1,72 @@
+"""
+Reverse search: which headwords mention a term in their meaning, synonym or
+antonym fields.
+
+Posting lists map each term to the dictionary ordinals whose record contains
+it, with a bitmask of the fields it occurred in (``ordinal << 3 | mask``). They
+are built once per dictionary version and can be persisted as a tdict index
+file tagged with the dictionary's stamp, so later processes mmap them instead
+of rebuilding.
+"""
+import re, struct
+import tdict, morph
+
+FIELDS  = {"meaning":1, "synonym":2, "antonym":4}
+# Record field -> searchable field; the keyed records carry english/tamil glosses instead of meaning.
+_SOURCE = {"meaning":"meaning", "english":"meaning", "tamil":"meaning",
+           "synonym":"synonym", "antonym":"antonym"}
+_TERM   = re.compile(r'[\u0B80-\u0BFF]+|[A-Za-z]+')
+
+
+def terms(text):
+    return [t.lower() for t in _TERM.findall(text or "") if len(t) > 1]
+
+
+def build_postings(dindex):
+    """{term: [ordinal << 3 | field mask, ...]} for every record in a DictIndex."""
+    post = {}
+    for i in range(len(dindex)):
+        rec = dindex.value_at(i)
+        for src, field in _SOURCE.items():
+            if not isinstance(rec.get(src), str):
+                continue
+            for t in terms(rec[src]):
+                masks = post.setdefault(t, {})
+                masks[i] = masks.get(i, 0) | FIELDS[field]
+    return {t: [i << 3 | m for i, m in sorted(masks.items())] for t, masks in post.items()}
+
+
+class ReverseIndex:
+    def __init__(self, dindex, postings):
+        self._dict, self._post = dindex, postings
+
+    def _postings(self, term):
+        p = self._post.get(term)
+        if p is None and not term.isascii():
+            # Query words are often inflected; fall back to their stems.
+            p = next((self._post[s] for s in morph.stems(term) if s in self._post), None)
+        return p or ()
+
+    def search(self, query, fields=("meaning", "synonym"), limit=50):
+        """Headwords whose `fields` contain every term of `query`, in dictionary order."""
+        mask, hits = sum(FIELDS[f] for f in fields), None
+        for t in terms(query):
+            ords = {p >> 3 for p in self._postings(t) if p & mask}
+            hits = ords if hits is None else hits & ords
+            if not hits:
+                return []
+        return [self._dict.key_at(i) for i in sorted(hits or ())[:limit]]
+
+
+def open_reverse(dindex, path=None):
+    """ReverseIndex for `dindex`, reusing (or writing) the persisted postings at `path`."""
+    if path is None:
+        return ReverseIndex(dindex, build_postings(dindex))
+    try:
+        post = tdict.DictIndex(path)
+        if post.stamp == dindex.stamp:
+            return ReverseIndex(dindex, post)
+    except (OSError, ValueError, struct.error):
+        pass
+    tdict.write_index(build_postings(dindex), path, dindex.stamp)
+    return ReverseIndex(dindex, tdict.DictIndex(path))
@@ -0,0 +1,251 @@
+"""
+Extractive summarization and summary evaluation (ROUGE, compression, keyword
+coverage), with the Tamil word helpers they share. Pure functions with no
+import-time side effects, so batch workers can use them without loading the
+lookup tiers in engine.py, which re-exports them.
+"""
+import re, math
+from collections import Counter
+import metrics
+
+_TAMIL_RE   = re.compile(r'[\u0B80-\u0BFF]+')
+_PUNC_STRIP = re.compile(r'^[^\u0B80-\u0BFF]+|[^\u0B80-\u0BFF]+$')
+
+def clean_word(w):
+    w = _PUNC_STRIP.sub('', w).strip()
+    return re.sub(r'[\u0B82\u0B83]+$', '', w)
+
+def is_tamil_word(w):
+    cw = clean_word(w)
+    return len(cw) >= 2 and bool(_TAMIL_RE.search(cw))
+
+def get_tamil_sentences(text):
+    """
+    Split Tamil text into sentence units.
+    For Tamil legal docs, each line/block is a natural sentence unit.
+    Also splits within lines on Tamil + standard punctuation.
+    """
+    line_sents = [l.strip() for l in text.splitlines() if l.strip()]
+    final = []
+    for line in line_sents:
+        sub = re.split(r'[।॥\u0964\u0965\.\!\?;]+', line)
+        for s in sub:
+            s = s.strip()
+            if len(s) > 5:
+                final.append(s)
+    seen, result = set(), []
+    for s in final:
+        if s not in seen:
+            seen.add(s)
+            result.append(s)
+    return result if result else [text.strip()]
+
+def score_sentence_tfidf(sentences):
+    """Score sentences using TF-IDF-like approach for Tamil."""
+    all_words = []
+    sent_words = []
+    for s in sentences:
+        words = [clean_word(w) for w in s.split() if is_tamil_word(w)]
+        sent_words.append(words)
+        all_words.extend(words)
+
+    total_docs = len(sentences)
+    word_doc_freq = Counter()
+    for sw in sent_words:
+        for w in set(sw):
+            word_doc_freq[w] += 1
+
+    total_word_freq = Counter(all_words)
+
+    scores = []
+    for i, sw in enumerate(sent_words):
+        if not sw:
+            scores.append(0.0)
+            continue
+        score = 0.0
+        for w in sw:
+            tf  = sw.count(w) / len(sw)
+            idf = math.log((total_docs + 1) / (word_doc_freq[w] + 1)) + 1
+            score += tf * idf
+        scores.append(score / len(sw))
+    return scores
+
+def score_sentence_position(sentences):
+    """Positional bias: first and last sentences score higher."""
+    n = len(sentences)
+    scores = []
+    for i in range(n):
+        if i == 0 or i == n - 1:
+            scores.append(1.0)
+        elif i < n * 0.25:
+            scores.append(0.7)
+        elif i > n * 0.75:
+            scores.append(0.5)
+        else:
+            scores.append(0.3)
+    return scores
+
+def score_sentence_length(sentences):
+    """Prefer medium-length sentences, penalise very short/long."""
+    scores = []
+    for s in sentences:
+        wc = len(s.split())
+        if 8 <= wc <= 25:
+            scores.append(1.0)
+        elif 5 <= wc < 8:
+            scores.append(0.6)
+        elif wc > 25:
+            scores.append(0.7)
+        else:
+            scores.append(0.3)
+    return scores
+
+@metrics.timed("extractive_summarize")
+def extractive_summarize(text, ratio=0.4, method="hybrid"):
+    """
+    Extractive summarization with three methods:
+      - tfidf    : TF-IDF scoring
+      - position : positional lead-bias
+      - hybrid   : weighted blend
+    Returns (summary_text, selected_indices, all_scores_dict).
+    """
+    sentences = get_tamil_sentences(text)
+    n = len(sentences)
+
+    if n == 0:
+        return text, [], {}
+    if n <= 3:
+        return text, list(range(n)), {}
+    n_select = max(3, min(n - 1, round(n * ratio)))
+
+    tfidf_scores    = score_sentence_tfidf(sentences)
+    position_scores = score_sentence_position(sentences)
+    length_scores   = score_sentence_length(sentences)
+
+    if method == "tfidf":
+        final_scores = tfidf_scores
+    elif method == "position":
+        final_scores = position_scores
+    else:  # hybrid
+        final_scores = [
+            0.5 * t + 0.3 * p + 0.2 * l
+            for t, p, l in zip(tfidf_scores, position_scores, length_scores)
+        ]
+
+    ranked = sorted(range(len(sentences)), key=lambda i: final_scores[i], reverse=True)
+    selected = sorted(ranked[:n_select])
+    summary  = " ".join(sentences[i] for i in selected)
+
+    scores_dict = {
+        "tfidf":    tfidf_scores,
+        "position": position_scores,
+        "length":   length_scores,
+        "final":    final_scores,
+    }
+    return summary, selected, scores_dict
+
+
+def get_ngrams(tokens, n):
+    return Counter(tuple(tokens[i:i+n]) for i in range(len(tokens)-n+1))
+
+def rouge_n(reference_tokens, summary_tokens, n=1):
+    ref_ng = get_ngrams(reference_tokens, n)
+    sum_ng = get_ngrams(summary_tokens, n)
+    if not ref_ng or not sum_ng:
+        return 0.0
+    overlap = sum(min(ref_ng[k], sum_ng[k]) for k in sum_ng)
+    recall  = overlap / sum(ref_ng.values())
+    precision = overlap / sum(sum_ng.values())
+    if precision + recall == 0:
+        return 0.0
+    f1 = 2 * precision * recall / (precision + recall)
+    return round(f1 * 100, 1)
+
+def lcs_length(a, b):
+    m, n = len(a), len(b)
+    dp = [[0]*(n+1) for _ in range(2)]
+    for i in range(1, m+1):
+        for j in range(1, n+1):
+            if a[i-1] == b[j-1]:
+                dp[i%2][j] = dp[(i-1)%2][j-1] + 1
+            else:
+                dp[i%2][j] = max(dp[(i-1)%2][j], dp[i%2][j-1])
+    return dp[m%2][n]
+
+def rouge_l(reference_tokens, summary_tokens):
+    if not reference_tokens or not summary_tokens:
+        return 0.0
+    lcs = lcs_length(reference_tokens, summary_tokens)
+    recall    = lcs / len(reference_tokens)
+    precision = lcs / len(summary_tokens)
+    if precision + recall == 0:
+        return 0.0
+    f1 = 2 * precision * recall / (precision + recall)
+    return round(f1 * 100, 1)
+
+def compression_ratio(original_text, summary_text):
+    orig_wc = len(original_text.split())
+    sum_wc  = len(summary_text.split())
+    if orig_wc == 0:
+        return 0.0
+    ratio = (1 - sum_wc / orig_wc) * 100
+    return round(max(0.0, min(100.0, ratio)), 1)
+
+def keyword_coverage(original_text, summary_text, top_n=15):
+    orig_words = [clean_word(w) for w in original_text.split() if is_tamil_word(w)]
+    sum_words  = set(clean_word(w) for w in summary_text.split() if is_tamil_word(w))
+    if not orig_words:
+        return 0.0, [], []
+    freq = Counter(orig_words)
+    top_kws = [w for w, _ in freq.most_common(top_n) if len(w) > 2]
+    covered = [w for w in top_kws if w in sum_words]
+    score   = round(len(covered) / len(top_kws) * 100, 1) if top_kws else 0.0
+    return score, top_kws, covered
+
+def lexical_diversity(text):
+    words = [clean_word(w) for w in text.split() if is_tamil_word(w)]
+    if len(words) < 3:
+        return 0.0
+    return round(len(set(words)) / len(words) * 100, 1)
+
+def avg_sentence_length(text):
+    sents = get_tamil_sentences(text)
+    if not sents:
+        return 0
+    total = sum(len(s.split()) for s in sents)
+    return round(total / len(sents), 1)
+
+@metrics.timed("evaluate_summary")
+def evaluate_summary(original_text, summary_text, method_label=""):
+    orig_toks = [clean_word(w) for w in original_text.split() if is_tamil_word(w)]
+    sum_toks  = [clean_word(w) for w in summary_text.split() if is_tamil_word(w)]
+
+    r1  = rouge_n(orig_toks, sum_toks, 1)
+    r2  = rouge_n(orig_toks, sum_toks, 2)
+    rl  = rouge_l(orig_toks, sum_toks)
+    cr  = compression_ratio(original_text, summary_text)
+    kc, top_kws, covered_kws = keyword_coverage(original_text, summary_text)
+    ld_orig = lexical_diversity(original_text)
+    ld_sum  = lexical_diversity(summary_text)
+    asl_sum = avg_sentence_length(summary_text)
+    n_sents_orig = len(get_tamil_sentences(original_text))
+    n_sents_sum  = len(get_tamil_sentences(summary_text))
+
+    overall = round((r1 * 0.3 + r2 * 0.2 + rl * 0.2 + kc * 0.3), 1)
+
+    return {
+        "rouge_1": r1,
+        "rouge_2": r2,
+        "rouge_l": rl,
+        "compression_ratio": cr,
+        "keyword_coverage": kc,
+        "lexical_diversity_orig": ld_orig,
+        "lexical_diversity_sum":  ld_sum,
+        "avg_sent_len": asl_sum,
+        "n_sents_orig": n_sents_orig,
+        "n_sents_sum":  n_sents_sum,
+        "top_keywords": top_kws,
+        "covered_keywords": covered_kws,
+        "overall": overall,
+        "method": method_label,
+    }
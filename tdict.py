@@ -0,0 +1,312 @@
+"""
+Compiled dictionary index.
+
+`compile_index` turns one or more JSON dictionaries into a single binary file:
+
+    header   magic, entry count, source stamp
+    offsets  one (key_off, key_len, val_off, val_len) row per entry, keys sorted
+    pool     UTF-8 keys followed by compact JSON records
+
+`DictIndex` mmaps that file read-only and answers lookups with a binary search
+over the offset table, so start-up cost and resident memory do not grow with
+the dictionary and every worker process shares the same page-cache pages.
+
+`PrefixTrie` indexes headwords by Tamil letter (grapheme cluster) for the
+letter browser and search-as-you-type; `PrefixIndex` answers the same queries
+straight from a DictIndex.
+
+Build ahead of deploy with:  python tdict.py Tamil.json [more.json ...] -o Tamil.tdx
+"""
+import json, mmap, os, re, struct, hashlib
+from pathlib import Path
+from collections.abc import Mapping
+
+SOURCES  = (Path(__file__).parent / "Tamil.json",)
+INDEX    = Path(__file__).parent / "Tamil.tdx"
+MAGIC    = b"TDX1"
+_HDR     = struct.Struct("<4sI8s")
+_ENT     = struct.Struct("<IIII")
+# A letter is one base character plus any vowel signs, pulli or joiners after it.
+_GRAPHEME = re.compile(r'.[\u0B82\u0BBE-\u0BCD\u0BD7\u200C\u200D]*', re.S)
+
+
+def graphemes(word):
+    """Split text into Tamil letters, e.g. "கால்" -> ["கா", "ல்"]."""
+    return _GRAPHEME.findall(word)
+
+
+def read_source(path):
+    """
+    Yield (word, record) pairs from a dictionary file.
+    Accepts a list of {"word": ..., ...} records, a {word: record} object,
+    or several such JSON documents concatenated in one file.
+    """
+    text = Path(path).read_text(encoding="utf-8")
+    dec, i = json.JSONDecoder(), 0
+    while True:
+        while i < len(text) and text[i].isspace():
+            i += 1
+        if i >= len(text):
+            break
+        doc, i = dec.raw_decode(text, i)
+        if isinstance(doc, dict):
+            for w, rec in doc.items():
+                if isinstance(rec, dict):
+                    yield w.strip(), rec
+        elif isinstance(doc, list):
+            for rec in doc:
+                if isinstance(rec, dict) and rec.get("word"):
+                    yield rec["word"].strip(), {k:v for k,v in rec.items() if k != "word"}
+
+
+def source_stamp(sources):
+    """Cheap fingerprint of the source files (name, size, mtime) for staleness checks."""
+    h = hashlib.blake2b(digest_size=8)
+    for p in sources:
+        st = os.stat(p)
+        h.update(f"{Path(p).name}:{st.st_size}:{st.st_mtime_ns};".encode())
+    return h.digest()
+
+
+def compile_index(sources, out_path):
+    """Merge `sources` into one sorted index at `out_path` (written atomically)."""
+    entries = {}
+    for src in sources:
+        for w, rec in read_source(src):
+            if w:
+                entries[w] = {**entries.get(w, {}), **rec}
+    return write_index(entries, out_path, source_stamp(sources))
+
+
+def write_index(entries, out_path, stamp):
+    """Write a {key: JSON-able value} mapping as an index file tagged with `stamp`."""
+    keys  = sorted((w.encode("utf-8"), w) for w in entries)
+    pool  = bytearray()
+    table = bytearray()
+    for kb, w in keys:
+        vb = json.dumps(entries[w], ensure_ascii=False, separators=(",",":")).encode("utf-8")
+        k_off = len(pool); pool += kb
+        v_off = len(pool); pool += vb
+        table += _ENT.pack(k_off, len(kb), v_off, len(vb))
+
+    out_path = Path(out_path)
+    tmp = out_path.with_name(f"{out_path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HDR.pack(MAGIC, len(keys), stamp))
+        f.write(table)
+        f.write(pool)
+    os.replace(tmp, out_path)
+    return out_path
+
+
+class DictIndex(Mapping):
+    """Read-only, mmap-backed mapping of key -> JSON value (headword -> record dict)."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._n, self.stamp = _HDR.unpack_from(self._mm)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a dictionary index")
+        self._pool = _HDR.size + self._n * _ENT.size
+
+    def _row(self, i):
+        return _ENT.unpack_from(self._mm, _HDR.size + i * _ENT.size)
+
+    def _key_bytes(self, i):
+        k_off, k_len, _, _ = self._row(i)
+        return self._mm[self._pool + k_off:self._pool + k_off + k_len]
+
+    def key_at(self, i):
+        return self._key_bytes(i).decode("utf-8")
+
+    def value_at(self, i):
+        _, _, v_off, v_len = self._row(i)
+        return json.loads(self._mm[self._pool + v_off:self._pool + v_off + v_len])
+
+    def find(self, word):
+        """Ordinal of `word` in sorted order, or -1."""
+        kb = word.encode("utf-8")
+        lo, hi = 0, self._n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            k = self._key_bytes(mid)
+            if k < kb:   lo = mid + 1
+            elif k > kb: hi = mid
+            else:        return mid
+        return -1
+
+    def bisect(self, kb):
+        """Ordinal of the first key not below the UTF-8 bytes `kb`."""
+        lo, hi = 0, self._n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_bytes(mid) < kb: lo = mid + 1
+            else:                         hi = mid
+        return lo
+
+    def __getitem__(self, word):
+        i = self.find(word) if isinstance(word, str) else -1
+        if i < 0:
+            raise KeyError(word)
+        return self.value_at(i)
+
+    def __contains__(self, word):
+        return isinstance(word, str) and self.find(word) >= 0
+
+    def __len__(self):
+        return self._n
+
+    def __iter__(self):
+        return (self.key_at(i) for i in range(self._n))
+
+
+class _Node:
+    __slots__ = ("kids", "n", "word")
+
+    def __init__(self):
+        self.kids, self.n, self.word = {}, 0, None
+
+
+class PrefixTrie:
+    """
+    Headword trie keyed by grapheme, with subtree counts so a page of results
+    costs O(prefix + offset-skipped subtrees + page) rather than a full scan.
+    Children keep insertion order, so build it from the (sorted) index.
+    """
+
+    def __init__(self, words=()):
+        self.root = _Node()
+        for w in words:
+            self.insert(w)
+
+    def insert(self, word):
+        path = [self.root]
+        for g in graphemes(word):
+            path.append(path[-1].kids.setdefault(g, _Node()))
+        if path[-1].word is None:
+            path[-1].word = word
+            for nd in path:
+                nd.n += 1
+
+    def _nodes(self, prefix, partial=False):
+        """
+        Nodes under `prefix`. With `partial`, the last letter may still be
+        mid-typing, so "க" also reaches "கா", "கி", ... (autocomplete).
+        """
+        gs = graphemes(prefix)
+        node = self.root
+        for g in gs[:-1]:
+            node = node.kids.get(g)
+            if node is None:
+                return []
+        if not gs:
+            return [node]
+        if not partial:
+            return [node.kids[gs[-1]]] if gs[-1] in node.kids else []
+        return [nd for g, nd in node.kids.items() if g.startswith(gs[-1])]
+
+    def letters(self):
+        """First letters with their word counts, in trie order."""
+        return [(g, nd.n) for g, nd in self.root.kids.items()]
+
+    def count(self, prefix="", partial=False):
+        return sum(nd.n for nd in self._nodes(prefix, partial))
+
+    def complete(self, prefix="", offset=0, limit=10, partial=False):
+        """Up to `limit` headwords starting with `prefix`, skipping the first `offset`."""
+        out, stack = [], list(reversed(self._nodes(prefix, partial)))
+        while stack and len(out) < limit:
+            nd = stack.pop()
+            if offset >= nd.n:
+                offset -= nd.n
+                continue
+            if nd.word is not None:
+                if offset: offset -= 1
+                else:      out.append(nd.word)
+            stack.extend(reversed(nd.kids.values()))
+        return out
+
+
+# Code point ranges [lo, hi) that continue a letter rather than start one (see _GRAPHEME).
+_MARKS = [("\u0B82", "\u0B83"), ("\u0BBE", "\u0BCE"), ("\u0BD7", "\u0BD8"), ("\u200C", "\u200E")]
+
+
+class PrefixIndex:
+    """
+    PrefixTrie's queries answered by binary search over a DictIndex's sorted
+    keys, so nothing is built at start-up or held per process. Words come back
+    in index order; a trie walk differs only where a letter is followed by a
+    sign sorting below the consonants (the rare anusvara) or a non-Tamil one.
+    """
+
+    def __init__(self, dindex):
+        self._d, self._letters = dindex, None
+
+    def _ranges(self, prefix, partial=False):
+        """
+        Ordinal ranges [lo, hi) of the words under `prefix`. Without `partial`
+        its last letter must be complete, so "க" skips the கா, கி, ... runs.
+        """
+        p = prefix.encode("utf-8")
+        lo, hi = self._d.bisect(p), self._d.bisect(p + b"\xff")
+        if not prefix or partial:
+            return [(lo, hi)] if lo < hi else []
+        out = []
+        for a, b in _MARKS:
+            cut_lo, cut_hi = self._d.bisect(p + a.encode("utf-8")), self._d.bisect(p + b.encode("utf-8"))
+            if lo < cut_lo: out.append((lo, cut_lo))
+            lo = max(lo, cut_hi)
+        if lo < hi: out.append((lo, hi))
+        return out
+
+    def letters(self):
+        """First letters with their word counts, in index order."""
+        if self._letters is None:
+            out, i = {}, 0
+            while i < len(self._d):
+                g = graphemes(self._d.key_at(i))[0]
+                ranges = self._ranges(g)
+                out.setdefault(g, sum(hi - lo for lo, hi in ranges))
+                i = next(hi for lo, hi in ranges if lo <= i < hi)
+            self._letters = list(out.items())
+        return self._letters
+
+    def count(self, prefix="", partial=False):
+        return sum(hi - lo for lo, hi in self._ranges(prefix, partial))
+
+    def complete(self, prefix="", offset=0, limit=10, partial=False):
+        """Up to `limit` headwords starting with `prefix`, skipping the first `offset`."""
+        out = []
+        for lo, hi in self._ranges(prefix, partial):
+            lo += offset
+            offset = max(0, lo - hi)
+            out += [self._d.key_at(i) for i in range(lo, min(hi, lo + limit - len(out)))]
+            if len(out) >= limit:
+                break
+        return out
+
+
+def open_index(sources, index_path):
+    """Open `index_path`, recompiling it first if missing or older than `sources`."""
+    index_path = Path(index_path)
+    stamp = source_stamp(sources)
+    try:
+        idx = DictIndex(index_path)
+        if idx.stamp == stamp:
+            return idx
+    except (OSError, ValueError, struct.error):
+        pass
+    compile_index(sources, index_path)
+    return DictIndex(index_path)
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Compile JSON dictionaries into a mmap-able index.")
+    ap.add_argument("sources", nargs="*", default=[str(p) for p in SOURCES])
+    ap.add_argument("-o", "--out", default=str(INDEX))
+    args = ap.parse_args()
+    out = compile_index(args.sources, args.out)
+    print(f"{out}: {len(DictIndex(out)):,} entries")